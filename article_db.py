@@ -0,0 +1,298 @@
+import queue
+import re
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from article_table import to_microseconds
+
+
+def fts5_available():
+    """Check whether the sqlite3 module was built with the FTS5 extension"""
+    try:
+        conn = sqlite3.connect(':memory:')
+        conn.execute('CREATE VIRTUAL TABLE probe USING fts5(text)')
+        conn.close()
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+FTS5_AVAILABLE = fts5_available()
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS articles (
+        id INTEGER PRIMARY KEY,
+        url TEXT NOT NULL UNIQUE,
+        headline TEXT NOT NULL,
+        summary TEXT NOT NULL,
+        source TEXT NOT NULL,
+        category TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        story_id INTEGER NOT NULL DEFAULT 0
+    )''',
+    'CREATE INDEX IF NOT EXISTS articles_timestamp ON articles (timestamp)',
+    # External-content index: the text lives once, in the articles table
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        headline, summary,
+        content='articles', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )''',
+    '''CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts (rowid, headline, summary) VALUES (new.id, new.headline, new.summary);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts (articles_fts, rowid, headline, summary) VALUES ('delete', old.id, old.headline, old.summary);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+        INSERT INTO articles_fts (articles_fts, rowid, headline, summary) VALUES ('delete', old.id, old.headline, old.summary);
+        INSERT INTO articles_fts (rowid, headline, summary) VALUES (new.id, new.headline, new.summary);
+    END''',
+]
+
+# Quoted phrases, or single terms with an optional trailing * for prefix search
+QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+OPERATORS = {'AND', 'OR', 'NOT'}
+
+# Headline matches count twice as much as summary matches in the ranking
+HEADLINE_WEIGHT = 2.0
+SUMMARY_WEIGHT = 1.0
+
+
+def build_match_query(text):
+    """Turn a search box string into an FTS5 MATCH expression
+
+    "exact phrase" searches for the phrase, infl* matches every word
+    starting with infl, and OR / NOT are passed through as operators.
+    Other terms are ANDed together. Everything else is quoted, so user
+    input can never be a syntax error.
+    """
+    parts = []
+    for phrase, term in QUERY_TOKEN.findall(text or ''):
+        if phrase:
+            words = phrase.split()
+            if words:
+                parts.append('"' + ' '.join(words).replace('"', '') + '"')
+            continue
+        if term in OPERATORS:
+            if parts and parts[-1] not in OPERATORS:
+                parts.append(term)
+            continue
+        prefix = term.endswith('*')
+        term = term.rstrip('*').replace('"', '')
+        if term:
+            parts.append(f'"{term}"' + ('*' if prefix else ''))
+    while parts and parts[-1] in OPERATORS:
+        parts.pop()
+    return ' '.join(parts)
+
+
+class ArticleDatabase:
+    """SQLite article store with an FTS5 full-text index on headline and summary
+
+    Every saved article goes into a regular table (one row per URL) and is
+    indexed by FTS5 through triggers, so search covers the whole history.
+    Results are ranked with bm25, and prefix (term*) and phrase ("...")
+    queries are supported.
+    """
+
+    def __init__(self, path):
+        if not FTS5_AVAILABLE:
+            raise RuntimeError("SQLite was built without FTS5; full-text search is unavailable")
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+        self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+
+    def add_articles(self, articles):
+        """Insert article dicts and return the number added
+
+        A URL that is already stored is only updated when the new summary is
+        longer (an enriched summary replacing the RSS one).
+        """
+        rows = [
+            (
+                article['url'], article['headline'] or '', article['summary'] or '',
+                article['source'], article['category'],
+                to_microseconds(article['timestamp']), int(article.get('story_id') or 0)
+            )
+            for article in articles if article.get('url')
+        ]
+        with self.lock:
+            # New rows get consecutive ids after the current maximum
+            before = self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM articles').fetchone()[0]
+            try:
+                self.conn.executemany(
+                    'INSERT INTO articles (url, headline, summary, source, category, timestamp, story_id) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (url) DO UPDATE SET summary = excluded.summary '
+                    'WHERE length(excluded.summary) > length(articles.summary)', rows
+                )
+                self.conn.commit()
+            except Exception:
+                # Leave nothing of a failed batch in the open transaction
+                self.conn.rollback()
+                raise
+            return self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM articles').fetchone()[0] - before
+
+    def search(self, query, limit=500, start_date=None, end_date=None, categories=None, sources=None):
+        """Return the best-matching articles for a search string as a DataFrame, best first
+
+        start_date and end_date are inclusive dates; the rank column holds
+        the bm25 score (lower is better).
+        """
+        match = build_match_query(query)
+        if not match:
+            return pd.DataFrame(columns=['headline', 'summary', 'url', 'source', 'category', 'timestamp', 'story_id', 'rank'])
+
+        conditions = ['articles_fts MATCH ?']
+        params = [match]
+        if start_date is not None:
+            conditions.append('a.timestamp >= ?')
+            params.append(to_microseconds(pd.Timestamp(start_date, tz='UTC').to_pydatetime()))
+        if end_date is not None:
+            conditions.append('a.timestamp < ?')
+            params.append(to_microseconds((pd.Timestamp(end_date, tz='UTC') + pd.Timedelta(days=1)).to_pydatetime()))
+        for column, values in (('category', categories), ('source', sources)):
+            if values:
+                conditions.append(f"a.{column} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+        params.append(limit)
+
+        sql = (
+            f'SELECT a.headline, a.summary, a.url, a.source, a.category, a.timestamp, a.story_id, '
+            f'bm25(articles_fts, {HEADLINE_WEIGHT}, {SUMMARY_WEIGHT}) AS rank '
+            f'FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid '
+            f'WHERE {" AND ".join(conditions)} ORDER BY rank LIMIT ?'
+        )
+        with self.lock:
+            df = pd.read_sql_query(sql, self.conn, params=params)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='us', utc=True)
+        for column in ('source', 'category'):
+            df[column] = df[column].astype('category')
+        return df
+
+    def optimize(self):
+        """Merge the full-text index segments so searches touch fewer b-trees"""
+        with self.lock:
+            self.conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+            self.conn.commit()
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
+
+
+class ArticleWriter:
+    """Write-behind sink that appends articles to an ArticleDatabase on a background thread
+
+    submit() only queues a feed's articles and returns at once. The writer
+    thread collects them into batches of batch_size, or whatever has arrived
+    within flush_interval seconds, and writes each batch in one transaction.
+    A crash therefore loses at most the batch being collected. A batch that
+    fails to write is kept and retried with the next one, up to
+    max_attempts times or until it holds more than max_retained articles.
+    It is then written one article at a time, and the articles that still
+    fail are logged and dropped, so one bad row cannot hold back every
+    later batch.
+    """
+
+    def __init__(self, db, batch_size=500, flush_interval=2.0, log=None):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = 3
+        self.max_retained = batch_size * 4
+        self.log = log or (lambda message, level='info': None)
+        self.written = 0
+        self.failed_attempts = 0
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name='article-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, articles):
+        """Queue a list of article dicts for writing"""
+        if articles:
+            self.queue.put(list(articles))
+
+    def flush(self):
+        """Block until everything submitted so far has been written"""
+        if self.thread.is_alive():
+            done = threading.Event()
+            self.queue.put(done)
+            done.wait()
+
+    def close(self):
+        """Write what is left and stop the writer thread"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    def write(self, batch):
+        """Write one batch, returning the articles that still need writing"""
+        try:
+            self.written += self.db.add_articles(batch)
+            self.failed_attempts = 0
+            return []
+        except Exception as e:
+            self.failed_attempts += 1
+            if self.failed_attempts < self.max_attempts and len(batch) <= self.max_retained:
+                self.log(f"Could not write {len(batch)} articles, will retry: {str(e)}", 'error')
+                return batch
+            self.log(f"Could not write {len(batch)} articles after {self.failed_attempts} attempts, "
+                     f"writing them one at a time: {str(e)}", 'error')
+            self.write_rows(batch)
+            return []
+
+    def write_rows(self, batch):
+        """Write a batch one article at a time, dropping the articles that fail"""
+        self.failed_attempts = 0
+        dropped = 0
+        error = None
+        for article in batch:
+            try:
+                self.written += self.db.add_articles([article])
+            except Exception as e:
+                dropped += 1
+                error = e
+        if dropped:
+            self.log(f"Dropped {dropped} of {len(batch)} articles that could not be written: {str(error)}", 'error')
+
+    def run(self):
+        """Writer thread: collect submitted articles into batches and write them"""
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if not batch else max(0.0, deadline - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+
+            if isinstance(item, list):
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.extend(item)
+                if len(batch) < self.batch_size:
+                    continue
+
+            batch = self.write(batch) if batch else batch
+            if batch:
+                deadline = time.monotonic() + self.flush_interval
+
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                if batch:
+                    self.write_rows(batch)
+                return
@@ -0,0 +1,216 @@
+import hashlib
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from json_store import JsonStore
+from url_utils import canonicalize_url
+
+# lxml is several times faster than the built-in html.parser when it is installed
+try:
+    import lxml
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Page elements that never hold the article text
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'iframe', 'svg']
+
+
+class ArticleEnricher:
+    """Replaces short RSS summaries with summaries of the full article pages
+
+    Article pages are fetched on a bounded thread pool. The scraper's host
+    scheduler and a max_per_host limit keep each site's request rate polite.
+    Results are cached by canonical URL, so an article is only fetched once
+    across runs. A second index by content hash means identical pages served
+    under different URLs are only parsed once.
+    """
+
+    def __init__(self, scraper, cache_path):
+        self.scraper = scraper
+
+        # Concurrency and politeness
+        self.max_workers = 8
+        self.max_per_host = 2
+
+        # Which articles to enrich and how much of each page to read
+        self.min_summary_length = 80
+        self.min_paragraph_length = 40
+        self.max_page_bytes = 2 * 1024 * 1024
+        self.page_timeout = 20
+        self.deadline = 300
+
+        # Cached pages are forgotten after this many seconds
+        self.cache_max_age = 30 * 86400
+
+        self.cache = JsonStore(cache_path)
+        self.summaries_by_hash = {
+            state['content_hash']: state.get('summary', '')
+            for _, state in self.cache.items() if state.get('content_hash')
+        }
+
+    def log(self, message, level='info'):
+        """Log through the scraper's logger"""
+        self.scraper.log(message, level)
+
+    def needs_enrichment(self, summary):
+        """Check whether an RSS summary is too short to be useful on its own"""
+        return len(summary or '') < self.min_summary_length
+
+    def download_page(self, url):
+        """Download an HTML article page within the size cap and time limit"""
+        deadline = time.monotonic() + self.page_timeout
+        response = self.scraper.session.get(
+            url, timeout=(self.scraper.connect_timeout, self.scraper.read_timeout), stream=True
+        )
+        with response:
+            response.raise_for_status()
+            content_type = response.headers.get('content-type', '').split(';')[0].strip().lower()
+            if content_type and content_type not in ('text/html', 'application/xhtml+xml'):
+                raise ValueError(f"not an HTML page: {content_type}")
+
+            # The article text is near the top, so anything past the cap is dropped
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=65536):
+                if time.monotonic() > deadline:
+                    raise requests.Timeout(f"page download took longer than {self.page_timeout}s")
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= self.max_page_bytes:
+                    break
+        return b''.join(chunks)
+
+    def extract_text(self, body):
+        """Extract the main text of an article page"""
+        soup = BeautifulSoup(body, HTML_PARSER)
+        for tag in soup(BOILERPLATE_TAGS):
+            tag.decompose()
+
+        root = soup.find('article') or soup.find('main') or soup.body or soup
+        paragraphs = (p.get_text(' ', strip=True) for p in root.find_all('p'))
+        text = ' '.join(p for p in paragraphs if len(p) >= self.min_paragraph_length)
+        if text:
+            return text
+
+        # Fall back to the description the page declares for link previews
+        meta = soup.find('meta', attrs={'property': 'og:description'}) or soup.find('meta', attrs={'name': 'description'})
+        return meta.get('content', '') if meta else ''
+
+    def enrich_page(self, url):
+        """Fetch one article page and return (content hash, summary)"""
+        body = self.download_page(url)
+        content_hash = hashlib.sha256(body).hexdigest()
+
+        summary = self.summaries_by_hash.get(content_hash)
+        if summary is None:
+            summary = self.scraper.create_simple_summary(self.extract_text(body))
+            self.summaries_by_hash[content_hash] = summary
+        return content_hash, summary
+
+    def fetch_pages(self, pages):
+        """Fetch and summarize {canonical url: url} pages concurrently
+
+        Returns {canonical url: summary} for every page that could be fetched.
+        """
+        queues = {}
+        for canonical, url in pages.items():
+            queues.setdefault(urlparse(url).netloc.lower(), deque()).append((canonical, url))
+
+        results = {}
+        in_flight = {}
+        active = {}
+        deadline = time.monotonic() + self.deadline
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while queues or in_flight:
+                if time.monotonic() > deadline:
+                    self.log(f"Enrichment deadline reached, {sum(map(len, queues.values())) + len(in_flight)} pages skipped", 'warning')
+                    for future in in_flight:
+                        future.cancel()
+                    break
+
+                # Start one page for every host that has a free slot and a token
+                wake = 1.0
+                for host in list(queues):
+                    if len(in_flight) >= self.max_workers:
+                        break
+                    if active.get(host, 0) >= self.max_per_host:
+                        continue
+                    delay = self.scraper.host_scheduler.try_acquire(host)
+                    if delay > 0:
+                        wake = min(wake, delay)
+                        continue
+                    canonical, url = queues[host].popleft()
+                    if not queues[host]:
+                        del queues[host]
+                    in_flight[executor.submit(self.enrich_page, url)] = (host, canonical, url)
+                    active[host] = active.get(host, 0) + 1
+
+                if not in_flight:
+                    time.sleep(wake)
+                    continue
+
+                done, _ = wait(in_flight, timeout=wake, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, canonical, url = in_flight.pop(future)
+                    active[host] -= 1
+                    try:
+                        content_hash, summary = future.result()
+                    except Exception as e:
+                        self.log(f"Could not enrich {url}: {str(e)}", 'warning')
+                        continue
+                    results[canonical] = summary
+                    self.cache.update(canonical, content_hash=content_hash, summary=summary, fetched_at=time.time())
+
+        return results
+
+    def enrich(self, articles):
+        """Replace short summaries in an ArticleTable with summaries of the article pages, returning the rows changed"""
+        pages = {}
+        rows = {}
+        cached = 0
+        for i, (url, summary) in enumerate(zip(articles.urls, articles.summaries)):
+            if not url or not self.needs_enrichment(summary):
+                continue
+            canonical = canonicalize_url(url)
+            if canonical in rows:
+                rows[canonical].append(i)
+                continue
+            rows[canonical] = [i]
+            if self.cache.get(canonical):
+                cached += 1
+            else:
+                pages[canonical] = url
+
+        # Both messages count articles (rows); pages are counted once per canonical URL
+        candidates = sum(len(indexes) for indexes in rows.values())
+        self.log(f"Enriching {candidates} articles with short summaries "
+                 f"({len(rows)} pages: {cached} cached, {len(pages)} to fetch)")
+        results = self.fetch_pages(pages)
+
+        enriched = []
+        for canonical, indexes in rows.items():
+            summary = results.get(canonical)
+            if summary is None:
+                summary = self.cache.get(canonical).get('summary', '')
+            for i in indexes:
+                if len(summary) > len(articles.summaries[i]):
+                    articles.summaries[i] = summary
+                    enriched.append(i)
+
+        self.save_cache()
+        self.log(f"Enriched {len(enriched)} of {candidates} articles")
+        return enriched
+
+    def save_cache(self):
+        """Drop expired pages and write the cache to disk"""
+        cutoff = time.time() - self.cache_max_age
+        for key, state in self.cache.items():
+            if state.get('fetched_at', 0) < cutoff:
+                self.cache.discard(key)
+        self.cache.save()
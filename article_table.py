@@ -0,0 +1,225 @@
+import os
+from array import array
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_microseconds(value):
+    """Convert a timestamp to integer microseconds since the epoch (UTC)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def from_microseconds(value):
+    """Convert integer microseconds since the epoch back to a UTC datetime"""
+    return datetime.fromtimestamp(value // 1000000, timezone.utc).replace(microsecond=value % 1000000)
+
+
+def unique_url_rows(df):
+    """Return the positions of the rows to keep when merging copies of articles, in their original order
+
+    Of the rows sharing a URL, the one with the longest summary is kept (an
+    enriched summary beats the RSS one, as in ArticleDatabase.add_articles),
+    and the newest among equally long ones. Rows without a URL (empty or
+    missing) cannot be told apart, so every one of them is kept.
+    """
+    urls = df['url'].fillna('')
+    has_url = (urls != '').to_numpy(dtype=bool)
+    ranking = pd.DataFrame({
+        'url': urls.to_numpy(),
+        'length': df['summary'].fillna('').str.len().to_numpy(),
+        'timestamp': df['timestamp'].to_numpy(),
+    })[has_url]
+    ranking = ranking.sort_values(['length', 'timestamp'], ascending=False, kind='stable')
+    kept = ranking.index[~ranking['url'].duplicated()].to_numpy()
+    return np.sort(np.concatenate([kept, np.flatnonzero(~has_url)]))
+
+
+def read_snapshot(path):
+    """Open an Arrow snapshot written by ArticleTable.save_snapshot() as a DataFrame
+
+    The file is memory-mapped rather than read: text columns stay in the
+    mapped Arrow buffers (pyarrow-backed string dtype), timestamps are used
+    as they are, and only the small category codes are copied. Pages are
+    loaded on first access and shared by every process that opens the file.
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required to read Arrow snapshots")
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    string_dtype = pd.StringDtype('pyarrow')
+    return table.to_pandas(types_mapper={pa.string(): string_dtype, pa.large_string(): string_dtype}.get)
+
+
+class ArticleTable:
+    """Column-oriented store for scraped articles
+
+    Every article field is kept in its own column instead of one dict per
+    article. Source and category names repeat on almost every row, so they
+    are stored once in a lookup list and referenced by a small integer code.
+    Timestamps are kept as int64 microseconds (UTC) and story ids as int64
+    (0 when the article was not clustered) in compact arrays. to_frame() and
+    to_arrow() copy them, so the table can keep growing while a DataFrame
+    or Arrow table made from it is in use. The feed GUID is kept for the
+    scraper's own dedupe and returned by row(), but it is not part of
+    COLUMNS and is not written to DataFrames, snapshots or the stores.
+
+    It accepts the same article dicts the scraper produces (append/extend)
+    and yields them back when iterated, so code that loops over articles
+    keeps working.
+    """
+
+    COLUMNS = ('headline', 'summary', 'url', 'source', 'category', 'timestamp', 'story_id')
+
+    def __init__(self, articles=None):
+        self.clear()
+        if articles:
+            self.extend(articles)
+
+    def clear(self):
+        """Remove all articles"""
+        self.headlines = []
+        self.summaries = []
+        self.urls = []
+        self.guids = []
+        self.source_codes = array('i')
+        self.category_codes = array('i')
+        self.timestamps = array('q')
+        self.story_ids = array('q')
+        self.sources = []
+        self.categories = []
+        self.source_index = {}
+        self.category_index = {}
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def get_code(self, value, values, index):
+        """Return the integer code of a repeated string, adding it if it is new"""
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(values)
+            values.append(value)
+        return code
+
+    def append(self, article):
+        """Add one article dict"""
+        self.headlines.append(article['headline'])
+        self.summaries.append(article['summary'])
+        self.urls.append(article['url'])
+        self.guids.append(article.get('guid') or '')
+        self.source_codes.append(self.get_code(article['source'], self.sources, self.source_index))
+        self.category_codes.append(self.get_code(article['category'], self.categories, self.category_index))
+        self.timestamps.append(to_microseconds(article['timestamp']))
+        self.story_ids.append(article.get('story_id', 0))
+
+    def extend(self, articles):
+        """Add several article dicts"""
+        for article in articles:
+            self.append(article)
+
+    def row(self, i):
+        """Return article i as a dict"""
+        return {
+            'headline': self.headlines[i],
+            'summary': self.summaries[i],
+            'url': self.urls[i],
+            'source': self.sources[self.source_codes[i]],
+            'category': self.categories[self.category_codes[i]],
+            'timestamp': from_microseconds(self.timestamps[i]),
+            'story_id': self.story_ids[i],
+            'guid': self.guids[i]
+        }
+
+    def keep_rows(self, rows):
+        """Keep only the given row positions, in the given order"""
+        self.headlines = [self.headlines[i] for i in rows]
+        self.summaries = [self.summaries[i] for i in rows]
+        self.urls = [self.urls[i] for i in rows]
+        self.guids = [self.guids[i] for i in rows]
+        self.source_codes = array('i', (self.source_codes[i] for i in rows))
+        self.category_codes = array('i', (self.category_codes[i] for i in rows))
+        self.timestamps = array('q', (self.timestamps[i] for i in rows))
+        self.story_ids = array('q', (self.story_ids[i] for i in rows))
+
+    def to_frame(self):
+        """Return the articles as a DataFrame with categorical source/category columns"""
+        timestamps = self.int64s(self.timestamps)
+        return pd.DataFrame({
+            'headline': self.headlines,
+            'summary': self.summaries,
+            'url': self.urls,
+            'source': pd.Categorical.from_codes(self.codes(self.source_codes), categories=self.sources),
+            'category': pd.Categorical.from_codes(self.codes(self.category_codes), categories=self.categories),
+            'timestamp': pd.to_datetime(timestamps, unit='us', utc=True),
+            'story_id': self.int64s(self.story_ids)
+        }, columns=list(self.COLUMNS))
+
+    def to_arrow(self):
+        """Return the articles as a pyarrow Table with dictionary-encoded source/category
+
+        The integer columns are copied: Arrow would otherwise keep the
+        growable arrays exported, and append() could not resize them while
+        the table is alive.
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for ArticleTable.to_arrow()")
+        timestamps = self.int64s(self.timestamps).copy()
+        return pa.table({
+            'headline': pa.array(self.headlines, type=pa.string()),
+            'summary': pa.array(self.summaries, type=pa.string()),
+            'url': pa.array(self.urls, type=pa.string()),
+            'source': pa.DictionaryArray.from_arrays(
+                pa.array(self.codes(self.source_codes).copy()), pa.array(self.sources, type=pa.string())),
+            'category': pa.DictionaryArray.from_arrays(
+                pa.array(self.codes(self.category_codes).copy()), pa.array(self.categories, type=pa.string())),
+            'timestamp': pa.array(timestamps, type=pa.timestamp('us', tz='UTC')),
+            'story_id': pa.array(self.int64s(self.story_ids).copy())
+        })
+
+    def save_snapshot(self, path):
+        """Write the articles as an uncompressed Arrow IPC (Feather) file that readers can memory-map
+
+        Rows are written newest first, the order the dashboard shows them in,
+        so readers do not have to sort (and copy) the mapped columns.
+        """
+        table = self.to_arrow()
+        timestamps = self.int64s(self.timestamps)
+        if len(timestamps) > 1 and not (timestamps[:-1] >= timestamps[1:]).all():
+            table = table.take(pc.sort_indices(table, sort_keys=[('timestamp', 'descending')]))
+        tmp_path = path + '.tmp'
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+        return path
+
+    def codes(self, column):
+        """Wrap an integer code column as a NumPy array without copying it"""
+        if not len(column):
+            return np.empty(0, np.int32)
+        return np.frombuffer(column, dtype=np.int32)
+
+    def int64s(self, column):
+        """Wrap an int64 column as a NumPy array without copying it"""
+        if not len(column):
+            return np.empty(0, np.int64)
+        return np.frombuffer(column, dtype=np.int64)
@@ -0,0 +1,215 @@
+import argparse
+import hashlib
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from article_table import ArticleTable
+from news_retention import SNAPSHOT_FILE, CATEGORY_FILE, snapshot_time, normalize_frame
+from rss_scraper import RSSNewsScraperMultiSource
+from seen_index import SeenIndex, article_keys
+
+
+def find_history_files(paths):
+    """Return the CSV snapshots under the given files and directories, oldest first
+
+    Per-category copies are only included when the all_news_* snapshot
+    saved with them is missing, since they hold the same rows.
+    """
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+            continue
+        for directory, _, names in os.walk(path):
+            files.extend(os.path.join(directory, name) for name in names if name.endswith('.csv'))
+
+    stamps = set()
+    for path in files:
+        match = SNAPSHOT_FILE.match(os.path.basename(path))
+        if match:
+            stamps.add((os.path.dirname(path), match.group(1)))
+
+    chosen = []
+    for path in files:
+        name = os.path.basename(path)
+        match = SNAPSHOT_FILE.match(name) or CATEGORY_FILE.match(name)
+        if match is None or not name.endswith('.csv'):
+            continue
+        if not name.startswith('all_news_') and (os.path.dirname(path), match.group(1)) in stamps:
+            continue
+        chosen.append((match.group(1), path))
+    return [path for _, path in sorted(chosen)]
+
+
+def init_import_worker():
+    """Leave Ctrl-C to the main process, which stops the pool cleanly"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def read_history_file(path):
+    """Read one CSV snapshot in a worker process, returning normalized article dicts and their seen-index keys
+
+    Rows without a parseable timestamp get the time the snapshot was saved,
+    and rows without a URL or headline are dropped.
+    """
+    df = normalize_frame(pd.read_csv(path, encoding='utf-8-sig', dtype=str, keep_default_na=False))
+    match = SNAPSHOT_FILE.match(os.path.basename(path)) or CATEGORY_FILE.match(os.path.basename(path))
+    saved_at = snapshot_time(f"all_news_{match.group(1)}.csv")
+    df['timestamp'] = df['timestamp'].fillna(pd.Timestamp(saved_at, tz='UTC'))
+    df = df[(df['url'] != '') & (df['headline'] != '')]
+    articles = df.to_dict('records')
+    return articles, [article_keys(article) for article in articles]
+
+
+class BackfillImporter:
+    """Loads old CSV snapshots into the article history (Parquet store and search database)
+
+    Files are parsed and normalized by a pool of worker processes. At most
+    max_pending of them are in flight at once, so memory stays bounded by a
+    few files whatever the size of the backlog. Results are consumed in file
+    order (oldest first) and deduplicated by canonical URL through a seen
+    index of their own. New articles are written in batches of about
+    batch_size articles. The files of a batch are recorded in the
+    imported_files table in the same transaction that commits their keys,
+    so an interrupted import resumes with the first batch that was not
+    finished. A batch that is imported again writes the same database rows
+    and the same Parquet file names. If those files were already merged by
+    a compaction, the new copies are dropped again the next time the
+    partition is compacted, since compaction keeps one row per URL.
+    """
+
+    def __init__(self, scraper=None, workers=None):
+        self.scraper = scraper or RSSNewsScraperMultiSource()
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = self.workers * 2
+        self.batch_size = 5000
+        self.state_path = os.path.join(self.scraper.output_dir, 'backfill.sqlite')
+        self.seen_index = SeenIndex(self.state_path)
+        self.seen_index.conn.execute(
+            'CREATE TABLE IF NOT EXISTS imported_files '
+            '(path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime INTEGER NOT NULL, rows INTEGER NOT NULL, imported_at INTEGER NOT NULL)'
+        )
+        self.seen_index.conn.commit()
+
+    def log(self, message, level='info'):
+        """Log through the scraper's logger"""
+        self.scraper.log(message, level)
+
+    def file_key(self, path):
+        """Return the (path, size, mtime) that identifies a version of a file"""
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_size, int(stat.st_mtime)
+
+    def is_imported(self, path):
+        """Check whether this version of a file was already imported"""
+        key = self.file_key(path)
+        row = self.seen_index.conn.execute(
+            'SELECT 1 FROM imported_files WHERE path = ? AND size = ? AND mtime = ?', key
+        ).fetchone()
+        return row is not None
+
+    def write_batch(self, files, table):
+        """Write a batch of new articles and record its (path, new article count) files as imported"""
+        if table:
+            article_store = self.scraper.get_article_store()
+            if article_store is not None:
+                # Named after the batch's first file, so a repeated batch replaces its files
+                # (or, once they are compacted, is deduplicated by the next compaction)
+                name = hashlib.blake2b(os.path.abspath(files[0][0]).encode('utf-8'), digest_size=8).hexdigest()
+                article_store.append(table.to_arrow(), name=f"backfill-{name}")
+            article_db = self.scraper.get_article_db()
+            if article_db is not None:
+                article_db.add_articles(table)
+
+        # Committed together with the batch's seen keys
+        now = int(time.time())
+        with self.seen_index.lock:
+            self.seen_index.conn.executemany(
+                'INSERT OR REPLACE INTO imported_files (path, size, mtime, rows, imported_at) VALUES (?, ?, ?, ?, ?)',
+                [(*self.file_key(path), rows, now) for path, rows in files]
+            )
+        self.seen_index.commit()
+        self.seen_index.conn.commit()
+
+    def run(self, paths):
+        """Import every CSV snapshot under paths; returns (files imported, articles added)"""
+        if self.scraper.get_article_store() is None and self.scraper.get_article_db() is None:
+            raise RuntimeError("No history store available: install pyarrow or use an SQLite build with FTS5")
+
+        files = [path for path in find_history_files(paths) if not self.is_imported(path)]
+        self.log(f"Importing {len(files)} history files with {self.workers} workers")
+
+        imported = 0
+        added = 0
+        started = time.time()
+        pending = deque()
+        remaining = iter(files)
+        batch_files = []
+        batch = ArticleTable()
+        executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_import_worker)
+        try:
+            while True:
+                # Keep a bounded window of files in flight
+                for path in remaining:
+                    pending.append((path, executor.submit(read_history_file, path)))
+                    if len(pending) >= self.max_pending:
+                        break
+                if not pending:
+                    break
+
+                path, future = pending.popleft()
+                try:
+                    articles, keys = future.result()
+                except Exception as e:
+                    self.log(f"Could not read {path}, skipping it: {str(e)}", 'error')
+                    continue
+                articles = self.seen_index.filter_new(articles, keys)
+                batch.extend(articles)
+                batch_files.append((path, len(articles)))
+                if len(batch) >= self.batch_size:
+                    self.write_batch(batch_files, batch)
+                    imported += len(batch_files)
+                    added += len(batch)
+                    batch_files = []
+                    batch = ArticleTable()
+                    self.log(f"Imported {imported}/{len(files)} files, {added} new articles")
+        except KeyboardInterrupt:
+            self.log(f"Import interrupted after {imported} files, run it again to resume", 'warning')
+            raise
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+        if batch_files:
+            self.write_batch(batch_files, batch)
+            imported += len(batch_files)
+            added += len(batch)
+
+        article_store = self.scraper.get_article_store()
+        if article_store is not None:
+            article_store.compact()
+        self.log(f"Imported {imported} files with {added} new articles in {time.time() - started:.1f}s")
+        return imported, added
+
+    def close(self):
+        """Close the import state database"""
+        self.seen_index.close()
+
+
+# Run the importer if executed directly
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import old CSV snapshots into the article history")
+    parser.add_argument('paths', nargs='*', default=['news_data'], help="CSV files or directories to import")
+    parser.add_argument('--workers', type=int, default=None, help="number of parser processes")
+    args = parser.parse_args()
+
+    importer = BackfillImporter(workers=args.workers)
+    try:
+        files, articles = importer.run(args.paths)
+    finally:
+        importer.close()
+    print(f"Backfill completed! Imported {files} files with {articles} new articles.")
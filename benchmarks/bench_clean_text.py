@@ -0,0 +1,97 @@
+"""Micro-benchmark for the headline and summary cleaning in rss_scraper
+
+Compares the per-string clean_text from before the precompiled patterns
+(previous_clean_text below) with the current clean_text and clean_texts
+on 100k headlines and 100k summaries. The texts mix ASCII and non-ASCII
+text, HTML entities and tags, and a third of the summaries are the same
+boilerplate string, as they are in real feeds.
+
+    python benchmarks/bench_clean_text.py [--entries 100000] [--repeat 3]
+"""
+import argparse
+import html
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss_scraper import RSSNewsScraperMultiSource
+
+
+def previous_clean_text(text):
+    """clean_text as it was before the batch cleaning, kept as the reference"""
+    if text is None:
+        return ''
+    text = str(text)
+    text = html.unescape(text)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = ' '.join(text.split())
+    text = re.sub(r'[^\w\s.,;:!?\'"-]', '', text)
+    return text.strip()
+
+
+WORDS = ['market', 'election', 'storm', 'rates', 'trade', 'talks', 'Brasília', 'São Paulo', 'economia',
+         'Zürich', 'naïve', 'café', '東京', 'Москва', 'déjà', '—', '“quoted”', "it's", 'U.S.', '$5bn', '50%']
+PIECES = ['&amp;', '&quot;', '&#8217;', '&nbsp;', '&lt;b&gt;', '<b>', '</b>', '<a href="https://x.example/">',
+          '</a>', '<br/>', '\t', '\n', '\r\n', ' ', '  ', '!', '?', '...', '(', ')', '#', '@', '*']
+BOILERPLATE = 'Read the full story on our website &raquo; <a href="https://news.example/">News Example</a>'
+
+
+def random_text(rng, words, ascii_only=False):
+    """Build one random headline or summary out of words, entities, tags and whitespace"""
+    vocabulary = [word for word in WORDS if word.isascii()] if ascii_only else WORDS
+    parts = []
+    for _ in range(words):
+        parts.append(rng.choice(vocabulary) if rng.random() < 0.75 else rng.choice(PIECES))
+        parts.append(' ' if rng.random() < 0.9 else '')
+    return ''.join(parts)
+
+
+def make_texts(count, seed=13):
+    """Return (headlines, summaries) lists of count entries each"""
+    rng = random.Random(seed)
+    headlines = [random_text(rng, rng.randint(4, 14), ascii_only=i % 2 == 0) for i in range(count)]
+    summaries = [BOILERPLATE if i % 3 == 0 else random_text(rng, rng.randint(15, 60), ascii_only=i % 2 == 0)
+                 for i in range(count)]
+    return headlines, summaries
+
+
+def best_time(function, repeat):
+    """Best wall time of function() over repeat runs"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark headline and summary cleaning")
+    parser.add_argument('--entries', type=int, default=100000, help="number of headlines and of summaries")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per variant, the best one is reported")
+    args = parser.parse_args()
+
+    scraper = RSSNewsScraperMultiSource(parse_only=True)
+    headlines, summaries = make_texts(args.entries)
+    texts = headlines + summaries
+
+    expected = [previous_clean_text(text) for text in texts]
+    if [scraper.clean_text(text) for text in texts] != expected or scraper.clean_texts(texts) != expected:
+        sys.exit("clean_text output differs from the previous implementation")
+
+    previous = best_time(lambda: [previous_clean_text(text) for text in texts], args.repeat)
+    current = best_time(lambda: [scraper.clean_text(text) for text in texts], args.repeat)
+    batch = best_time(lambda: (scraper.clean_texts(headlines), scraper.clean_texts(summaries)), args.repeat)
+
+    print(f"{args.entries} headlines + {args.entries} summaries, best of {args.repeat}")
+    print(f"  previous clean_text  {previous:.3f}s")
+    print(f"  clean_text           {current:.3f}s  ({previous / current:.2f}x)")
+    print(f"  clean_texts          {batch:.3f}s  ({previous / batch:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
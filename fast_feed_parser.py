@@ -0,0 +1,179 @@
+import io
+import re
+import xml.etree.ElementTree as ET
+
+from feedparser import FeedParserDict
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+DC_NS = '{http://purl.org/dc/elements/1.1/}'
+CONTENT_NS = '{http://purl.org/rss/1.0/modules/content/}'
+
+RSS_VERSIONS = ('2.0', '0.91', '0.92')
+
+# Markup that feedparser's sanitizer drops together with its text content
+UNSAFE_MARKUP = re.compile(rb'<\s*(script|style|applet)|javascript:', re.IGNORECASE)
+XML_ENCODING = re.compile(rb'^<\?xml[^>]*encoding=["\']([A-Za-z0-9._-]+)["\']')
+CHARSET = re.compile(r'charset=["\']?([A-Za-z0-9._-]+)', re.IGNORECASE)
+
+
+class UnsupportedFeed(Exception):
+    """Raised when a feed is malformed or uses features only feedparser handles"""
+
+
+def check_encoding(body, response_headers):
+    """Reject bodies whose encoding feedparser and ElementTree could disagree on"""
+    head = body.lstrip(b'\xef\xbb\xbf \t\r\n')[:200]
+    if not head.startswith(b'<'):
+        raise UnsupportedFeed('body does not start with markup')
+    if b'<!DOCTYPE' in body[:1024].upper():
+        raise UnsupportedFeed('document type declarations are not supported')
+
+    match = XML_ENCODING.match(head)
+    declared = match.group(1).decode('ascii').lower() if match else 'utf-8'
+    charset = CHARSET.search((response_headers or {}).get('content-type', ''))
+    if charset and charset.group(1).lower().replace('_', '-') != declared.replace('_', '-'):
+        raise UnsupportedFeed('HTTP charset disagrees with the XML declaration')
+    if declared not in ('utf-8', 'utf8', 'us-ascii', 'ascii'):
+        raise UnsupportedFeed(f'encoding {declared} is left to feedparser')
+
+
+def child_text(element, tag):
+    """Return the stripped text of a child element, or None if it is absent"""
+    child = element.find(tag)
+    if child is None:
+        return None
+    if len(child):
+        raise UnsupportedFeed(f'{tag} contains nested markup')
+    return (child.text or '').strip()
+
+
+def is_absolute(url):
+    """Check whether a link can be used without resolving it against a base URI"""
+    return url.startswith(('http://', 'https://'))
+
+
+def rss_item_to_entry(item):
+    """Convert an RSS <item> element into a feedparser-style entry"""
+    entry = FeedParserDict()
+
+    title = child_text(item, 'title')
+    if title is not None:
+        entry['title'] = title
+
+    guid = item.find('guid')
+    if guid is not None:
+        entry['id'] = (guid.text or '').strip()
+
+    link = child_text(item, 'link')
+    if link is None and guid is not None and guid.get('isPermaLink', 'true').lower() != 'false':
+        # feedparser uses a permalink guid as the link when there is no <link>
+        link = entry['id']
+    if link is not None:
+        if not is_absolute(link):
+            raise UnsupportedFeed('relative links need base URI resolution')
+        entry['link'] = link
+
+    description = child_text(item, 'description')
+    if description is not None:
+        if UNSAFE_MARKUP.search(description.encode('utf-8')):
+            raise UnsupportedFeed('description needs sanitizing')
+        entry['summary'] = description
+    elif item.find(CONTENT_NS + 'encoded') is not None:
+        raise UnsupportedFeed('content:encoded without a description')
+
+    published = child_text(item, 'pubDate')
+    if published is not None:
+        entry['published'] = published
+    elif item.find(DC_NS + 'date') is not None:
+        raise UnsupportedFeed('dc:date without a pubDate')
+
+    return entry
+
+
+def atom_entry_to_entry(element):
+    """Convert an Atom <entry> element into a feedparser-style entry"""
+    entry = FeedParserDict()
+
+    for tag in ('title', 'summary', 'content'):
+        child = element.find(ATOM_NS + tag)
+        if child is not None and (child.get('type') == 'xhtml' or len(child)):
+            raise UnsupportedFeed(f'xhtml {tag} is left to feedparser')
+
+    title = child_text(element, ATOM_NS + 'title')
+    if title is not None:
+        entry['title'] = title
+
+    for link in element.findall(ATOM_NS + 'link'):
+        if link.get('rel', 'alternate') == 'alternate' and link.get('href'):
+            href = link.get('href').strip()
+            if not is_absolute(href):
+                raise UnsupportedFeed('relative links need base URI resolution')
+            entry['link'] = href
+            break
+
+    entry_id = child_text(element, ATOM_NS + 'id')
+    if entry_id is not None:
+        entry['id'] = entry_id
+
+    summary = child_text(element, ATOM_NS + 'summary')
+    content = child_text(element, ATOM_NS + 'content')
+    for value in (summary, content):
+        if value and UNSAFE_MARKUP.search(value.encode('utf-8')):
+            raise UnsupportedFeed('content needs sanitizing')
+    if summary is not None:
+        entry['summary'] = summary
+    elif content is not None:
+        raise UnsupportedFeed('content without a summary is left to feedparser')
+
+    published = child_text(element, ATOM_NS + 'published')
+    if published is not None:
+        entry['published'] = published
+    updated = child_text(element, ATOM_NS + 'updated')
+    if updated is not None:
+        entry['updated'] = updated
+
+    return entry
+
+
+def iter_feed_entries(body, response_headers=None):
+    """Incrementally parse a well-formed RSS 2.0 or Atom feed, yielding its entries
+
+    Only the fields the scraper uses are extracted (title, link, summary, id
+    and the publication dates). Each entry is released as soon as it has been
+    yielded, so memory does not grow with the size of the feed. Anything
+    malformed or unusual raises UnsupportedFeed so the caller can fall back to
+    feedparser.
+    """
+    check_encoding(body, response_headers)
+
+    stack = []
+    entry_tag = None
+    try:
+        for event, element in ET.iterparse(io.BytesIO(body), events=('start', 'end')):
+            if event == 'start':
+                if not stack:
+                    if element.tag == 'rss' and element.get('version') in RSS_VERSIONS:
+                        entry_tag = 'item'
+                    elif element.tag == ATOM_NS + 'feed':
+                        entry_tag = ATOM_NS + 'entry'
+                    else:
+                        raise UnsupportedFeed(f'unsupported root element {element.tag}')
+                    if element.get('{http://www.w3.org/XML/1998/namespace}base'):
+                        raise UnsupportedFeed('xml:base needs base URI resolution')
+                stack.append(element)
+                continue
+
+            stack.pop()
+            if element.tag != entry_tag:
+                continue
+
+            if entry_tag == 'item':
+                yield rss_item_to_entry(element)
+            else:
+                yield atom_entry_to_entry(element)
+
+            # Drop the processed entry so the tree never holds the whole feed
+            if stack:
+                stack[-1].remove(element)
+    except ET.ParseError as e:
+        raise UnsupportedFeed(f'malformed XML: {e}')
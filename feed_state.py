@@ -0,0 +1,5 @@
+from json_store import JsonStore
+
+
+class FeedStateStore(JsonStore):
+    """Persistent per-feed state (HTTP validators, status, body hash) kept as JSON, keyed by feed URL"""
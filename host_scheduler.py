@@ -0,0 +1,76 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket rate limiter that also enforces a minimum interval between requests"""
+
+    def __init__(self, rate, burst=1, min_interval=0.0):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.min_interval = float(min_interval)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.last_request = None
+
+    def reserve(self, now):
+        """Take a token if one is available, otherwise return the seconds until one is"""
+        # Refill tokens for the time elapsed since the last check
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        delay = 0.0
+        if self.tokens < 1:
+            delay = (1 - self.tokens) / self.rate
+        if self.last_request is not None:
+            delay = max(delay, self.last_request + self.min_interval - now)
+        if delay > 0:
+            return delay
+
+        self.tokens -= 1
+        self.last_request = now
+        return 0.0
+
+
+class HostScheduler:
+    """Per-host politeness scheduler
+
+    Every host gets its own token bucket, so waiting for one host never delays
+    requests to another. Limits are looked up by domain: an entry for
+    'news.google.com' also applies to its subdomains.
+    """
+
+    def __init__(self, default_limit, host_limits=None):
+        self.default_limit = dict(default_limit)
+        self.host_limits = dict(host_limits or {})
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def get_limit(self, host):
+        """Return the limit configuration that applies to a host"""
+        host = host.lower()
+        for domain, limit in self.host_limits.items():
+            if host == domain or host.endswith('.' + domain):
+                return limit
+        return self.default_limit
+
+    def try_acquire(self, host):
+        """Reserve a request slot for a host without blocking
+
+        Returns 0 when the request may go ahead now, otherwise the number of
+        seconds to wait before asking again.
+        """
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(**self.get_limit(host))
+                self.buckets[host] = bucket
+            return bucket.reserve(time.monotonic())
+
+    def acquire(self, host):
+        """Block until a request to the host is allowed"""
+        while True:
+            delay = self.try_acquire(host)
+            if delay <= 0:
+                return
+            time.sleep(delay)
@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class JsonStore:
+    """Dictionary of JSON objects by string key, kept in one JSON file
+
+    Reads and updates happen in memory and are thread-safe; save() writes
+    the whole file atomically when something changed. Writers in other
+    processes are not coordinated: hold file_lock() around load, update
+    and save when more than one process writes the same file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """Load saved entries from disk, starting empty if the file is missing or corrupt"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.entries = data
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, key):
+        """Return a copy of the stored entry for a key (empty dict if unknown)"""
+        with self.lock:
+            return dict(self.entries.get(key, {}))
+
+    def items(self):
+        """Return a snapshot of (key, entry) pairs for every stored entry"""
+        with self.lock:
+            return [(key, dict(entry)) for key, entry in self.entries.items()]
+
+    def discard(self, key):
+        """Forget the stored entry for a key"""
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self.dirty = True
+
+    def update(self, key, **fields):
+        """Merge fields into the stored entry for a key"""
+        with self.lock:
+            self.entries.setdefault(key, {}).update(fields)
+            self.dirty = True
+
+    def save(self):
+        """Write the entries to disk atomically if anything changed"""
+        with self.lock:
+            if not self.dirty:
+                return
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on a lock file (created if missing) until the block exits
+
+    The lock is taken per open file, so it also excludes other threads of
+    the same process and must not be taken again while held.
+    """
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            # Locks the first byte; LK_LOCK retries for about 10 seconds before raising OSError
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,172 @@
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+# MinHash permutations are (a * x + b) mod p over 32-bit shingle hashes
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+WORD = re.compile(r'\w+')
+# Aggregators append the publisher to the headline ("... - Reuters")
+PUBLISHER_SUFFIX = re.compile(r'\s+[-|–—]\s+[^-|–—]{1,40}$')
+
+
+def normalize_headline(text):
+    """Lowercase a headline, drop a trailing publisher name and keep only its words"""
+    text = PUBLISHER_SUFFIX.sub('', text or '')
+    return ' '.join(WORD.findall(text.lower()))
+
+
+def headline_shingles(text, ngram_size):
+    """Return the word n-grams (1 to ngram_size words) of a normalized headline"""
+    words = text.split()
+    return {' '.join(words[i:i + n]) for n in range(1, ngram_size + 1) for i in range(len(words) - n + 1)}
+
+
+def candidate_probability(similarity, bands, rows):
+    """Probability that two headlines with this Jaccard similarity share at least one bucket"""
+    return 1 - (1 - similarity ** rows) ** bands
+
+
+def choose_bands(num_perm, threshold, false_positive_weight=0.2, steps=50):
+    """Pick the LSH (bands, rows) split that best separates pairs around the threshold
+
+    Minimizes the weighted area of missed pairs above the threshold and
+    candidate pairs below it. Candidates are verified against the threshold
+    afterwards, so a missed pair costs more than an extra comparison.
+    """
+    best = None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_positives = sum(
+                candidate_probability(threshold * (i + 0.5) / steps, bands, rows) for i in range(steps)
+            ) * threshold / steps
+            false_negatives = sum(
+                1 - candidate_probability(threshold + (1 - threshold) * (i + 0.5) / steps, bands, rows)
+                for i in range(steps)
+            ) * (1 - threshold) / steps
+            error = false_positive_weight * false_positives + (1 - false_positive_weight) * false_negatives
+            if best is None or error < best[0]:
+                best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class NearDuplicateIndex:
+    """Detects syndicated variants of the same headline with MinHash and LSH
+
+    Each headline is reduced to word unigrams and bigrams and a MinHash signature
+    whose agreement rate estimates the Jaccard similarity of two headlines.
+    The signature is cut into bands that are hashed into buckets, so only
+    headlines sharing a bucket are compared instead of every pair. Signatures
+    and buckets live in SQLite (in memory when path is None) and are pruned
+    after max_age_days, so history never has to be re-scanned.
+    """
+
+    def __init__(self, path=None, threshold=0.7, num_perm=128, ngram_size=2, max_age_days=7, seed=1):
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.ngram_size = ngram_size
+        self.max_age_days = max_age_days
+        self.min_words = 3
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+
+        rng = np.random.default_rng(seed)
+        self.perm_a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+        self.perm_b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+        # Odd multipliers that mix the rows of a band (and its position) into one bucket key
+        self.band_mix = rng.integers(0, 1 << 63, self.rows, dtype=np.uint64) | np.uint64(1)
+        self.band_salt = rng.integers(0, 1 << 63, self.bands, dtype=np.uint64)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self.create_tables(f"{num_perm}:{ngram_size}:{seed}:{self.bands}x{self.rows}")
+
+    def create_tables(self, params):
+        """Create the tables, starting over if they were built with other MinHash parameters"""
+        if self.path:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+        # Bucket lookups and inserts are random, keep the hot pages in memory
+        self.conn.execute('PRAGMA cache_size=-65536')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS params (value TEXT)')
+        row = self.conn.execute('SELECT value FROM params').fetchone()
+        if row is not None and row[0] != params:
+            self.conn.execute('DROP TABLE IF EXISTS signatures')
+            self.conn.execute('DROP TABLE IF EXISTS buckets')
+            self.conn.execute('DELETE FROM params')
+            row = None
+        if row is None:
+            self.conn.execute('INSERT INTO params (value) VALUES (?)', (params,))
+        self.conn.execute('CREATE TABLE IF NOT EXISTS signatures (id INTEGER PRIMARY KEY, added INTEGER NOT NULL, signature BLOB NOT NULL)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS buckets (bucket INTEGER NOT NULL, id INTEGER NOT NULL, '
+                          'PRIMARY KEY (bucket, id)) WITHOUT ROWID')
+        self.conn.commit()
+
+    def signature(self, headline):
+        """Return the MinHash signature of a headline, or None if it is too short to compare"""
+        text = normalize_headline(headline)
+        if text.count(' ') + 1 < self.min_words:
+            return None
+        shingles = headline_shingles(text, self.ngram_size)
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+        permuted = (np.outer(hashes, self.perm_a) + self.perm_b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def band_keys(self, signature):
+        """Hash each band of a signature to a 64-bit bucket key"""
+        used = signature[:self.bands * self.rows].astype(np.uint64).reshape(self.bands, self.rows)
+        keys = (used * self.band_mix).sum(axis=1) ^ self.band_salt
+        return keys.view(np.int64).tolist()
+
+    def find_match(self, signature, keys):
+        """Check whether a stored headline in the same buckets is at least threshold-similar"""
+        placeholders = ','.join('?' * len(keys))
+        candidates = self.conn.execute(
+            f'SELECT signature FROM signatures WHERE id IN '
+            f'(SELECT DISTINCT id FROM buckets WHERE bucket IN ({placeholders}))', keys
+        )
+        for (stored,) in candidates:
+            similarity = np.count_nonzero(np.frombuffer(stored, dtype=np.uint32) == signature) / self.num_perm
+            if similarity >= self.threshold:
+                return True
+        return False
+
+    def is_duplicate(self, headline):
+        """Check a headline against the index, adding it if it is not a near-duplicate"""
+        signature = self.signature(headline)
+        if signature is None:
+            return False
+        keys = self.band_keys(signature)
+        if self.find_match(signature, keys):
+            return True
+        cursor = self.conn.execute(
+            'INSERT INTO signatures (added, signature) VALUES (?, ?)', (int(time.time()), signature.tobytes())
+        )
+        self.conn.executemany('INSERT OR IGNORE INTO buckets (bucket, id) VALUES (?, ?)',
+                              [(key, cursor.lastrowid) for key in keys])
+        return False
+
+    def filter_new(self, articles):
+        """Return the articles whose headline is not a near-duplicate of one already indexed"""
+        with self.lock:
+            return [article for article in articles if not self.is_duplicate(article['headline'])]
+
+    def commit(self):
+        """Drop expired headlines and write the index to disk"""
+        with self.lock:
+            # Ids grow with time, so everything up to the newest expired id can go
+            cutoff = int(time.time()) - self.max_age_days * 86400
+            expired = self.conn.execute('SELECT MAX(id) FROM signatures WHERE added < ?', (cutoff,)).fetchone()[0]
+            if expired is not None:
+                self.conn.execute('DELETE FROM signatures WHERE id <= ?', (expired,))
+                self.conn.execute('DELETE FROM buckets WHERE id <= ?', (expired,))
+            self.conn.commit()
+
+    def close(self):
+        """Close the index, discarding uncommitted headlines"""
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,202 @@
+import argparse
+import os
+import re
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from article_table import ArticleTable, read_snapshot, unique_url_rows, PYARROW_AVAILABLE
+from json_store import JsonStore, file_lock
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_LOCK_NAME = 'manifest.json.lock'
+ARCHIVE_DIR = 'archive'
+
+# Snapshots saved by the scraper and the dashboard: all_news_YYYYMMDD_HHMMSS.csv / .arrow
+SNAPSHOT_FILE = re.compile(r'^all_news_(\d{8}_\d{6})\.(csv|arrow)$')
+# Per-category CSV copies saved next to a snapshot with the same time stamp
+CATEGORY_FILE = re.compile(r'^(?!all_news_).+_(\d{8}_\d{6})\.csv$')
+ARCHIVE_FILE = re.compile(r'^news_(\d{4}-\d{2})\.parquet$')
+
+
+def snapshot_time(name):
+    """Return the time stamp in a snapshot file name, or None if it is not a snapshot"""
+    match = SNAPSHOT_FILE.match(name)
+    return datetime.strptime(match.group(1), '%Y%m%d_%H%M%S') if match else None
+
+
+def read_news_file(path):
+    """Read a snapshot (Arrow or CSV) or a monthly archive (Parquet) as a DataFrame"""
+    if path.endswith('.arrow'):
+        return read_snapshot(path)
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def normalize_frame(df):
+    """Bring a snapshot read from any format to the ArticleTable columns and dtypes"""
+    df = df.reindex(columns=list(ArticleTable.COLUMNS))
+    for column in ('headline', 'summary', 'url'):
+        df[column] = df[column].fillna('').astype(str)
+    for column in ('source', 'category'):
+        df[column] = df[column].astype(str)
+    try:
+        df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True, format='ISO8601')
+    except (ValueError, TypeError):
+        df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True, format='mixed', errors='coerce')
+    df['story_id'] = pd.to_numeric(df['story_id'], errors='coerce').fillna(0).astype('int64')
+    return df
+
+
+class NewsRetention:
+    """Tiered retention for the news_data directory
+
+    Snapshots from the last hot_days days are left as they are. compact()
+    rolls older ones up into one zstd-compressed Parquet archive per month
+    (archive/news_YYYY-MM.parquet, one row per URL, every article without a
+    URL kept) and deletes them, together with the per-category CSV copies
+    saved alongside. The manifest
+    (manifest.json) lists the snapshots and archives so the dashboard reads
+    one small file instead of scanning the directory on every rerun.
+    Writers hold a lock file (manifest.json.lock) around each update so
+    the scraper, the dashboard and this job can record files concurrently.
+    """
+
+    def __init__(self, data_dir, hot_days=7):
+        self.data_dir = data_dir
+        self.hot_days = hot_days
+        self.archive_dir = os.path.join(data_dir, ARCHIVE_DIR)
+        self.manifest_path = os.path.join(data_dir, MANIFEST_NAME)
+        self.lock_path = os.path.join(data_dir, MANIFEST_LOCK_NAME)
+        self.compression = 'zstd'
+
+    def load_manifest(self):
+        """Open the manifest, building it from the directory if there is none yet"""
+        if not os.path.exists(self.manifest_path):
+            return self.rebuild_manifest()
+        return JsonStore(self.manifest_path)
+
+    def scan_files(self):
+        """Return manifest entries for the snapshots and archives found on disk"""
+        entries = {}
+        if os.path.isdir(self.data_dir):
+            for name in os.listdir(self.data_dir):
+                created = snapshot_time(name)
+                if created is not None:
+                    entries[name] = {'kind': 'snapshot', 'created': created.isoformat()}
+        if os.path.isdir(self.archive_dir):
+            for name in os.listdir(self.archive_dir):
+                match = ARCHIVE_FILE.match(name)
+                if match:
+                    entries[f"{ARCHIVE_DIR}/{name}"] = {'kind': 'archive', 'created': f"{match.group(1)}-01T00:00:00"}
+        return entries
+
+    def rebuild_manifest(self):
+        """Scan the directory and write a fresh manifest"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        with file_lock(self.lock_path):
+            entries = self.scan_files()
+            manifest = JsonStore(self.manifest_path)
+            for name in [name for name, _ in manifest.items() if name not in entries]:
+                manifest.discard(name)
+            for name, entry in entries.items():
+                manifest.update(name, **entry)
+            manifest.save()
+        return manifest
+
+    def add_snapshot(self, filename):
+        """Record a snapshot that was just saved in the data directory"""
+        created = snapshot_time(filename) or datetime.now()
+        os.makedirs(self.data_dir, exist_ok=True)
+        # Read, update and write under the lock so concurrent writers do not drop each other's entries
+        with file_lock(self.lock_path):
+            exists = os.path.exists(self.manifest_path)
+            manifest = JsonStore(self.manifest_path)
+            if not exists:
+                for name, entry in self.scan_files().items():
+                    manifest.update(name, **entry)
+            manifest.update(filename, kind='snapshot', created=created.isoformat())
+            manifest.save()
+
+    def list_files(self):
+        """Return the saved snapshots newest first, followed by the monthly archives newest first"""
+        entries = self.load_manifest().items()
+        snapshots = sorted((entry['created'], name) for name, entry in entries if entry.get('kind') == 'snapshot')
+        archives = sorted((entry['created'], name) for name, entry in entries if entry.get('kind') == 'archive')
+        return [name for _, name in reversed(snapshots)] + [name for _, name in reversed(archives)]
+
+    def archive_month(self, month, names):
+        """Merge snapshots into the archive of a month, returning the number of rows in the archive"""
+        archive_path = os.path.join(self.archive_dir, f"news_{month}.parquet")
+        frames = [pd.read_parquet(archive_path)] if os.path.exists(archive_path) else []
+        for name in names:
+            frames.append(read_news_file(os.path.join(self.data_dir, name)))
+
+        merged = pd.concat([normalize_frame(df) for df in frames], ignore_index=True)
+        merged = merged.sort_values('timestamp', kind='stable', ignore_index=True)
+        merged = merged.take(unique_url_rows(merged)).reset_index(drop=True)
+        for column in ('source', 'category'):
+            merged[column] = merged[column].astype('category')
+
+        # Write next to the archive and swap it in, so readers never see a partial file
+        os.makedirs(self.archive_dir, exist_ok=True)
+        tmp_path = os.path.join(self.archive_dir, f".news_{month}.parquet.tmp")
+        merged.to_parquet(tmp_path, compression=self.compression, index=False)
+        os.replace(tmp_path, archive_path)
+        return len(merged)
+
+    def compact(self, now=None):
+        """Archive snapshots older than hot_days by month and delete them
+
+        Returns (snapshots archived, files deleted). A snapshot that cannot
+        be deleted stays listed and is merged again on the next run, which
+        the per-URL deduplication makes harmless.
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required to write the monthly archives")
+        cutoff = (now or datetime.now()) - timedelta(days=self.hot_days)
+
+        by_month = {}
+        stamps = set()
+        for name in os.listdir(self.data_dir):
+            created = snapshot_time(name)
+            if created is not None and created < cutoff:
+                by_month.setdefault(created.strftime('%Y-%m'), []).append(name)
+                stamps.add(SNAPSHOT_FILE.match(name).group(1))
+
+        archived = 0
+        expired = []
+        for month, names in sorted(by_month.items()):
+            self.archive_month(month, sorted(names))
+            archived += len(names)
+            expired.extend(names)
+
+        # The per-category copies hold the same rows as the snapshot they were saved with
+        for name in os.listdir(self.data_dir):
+            match = CATEGORY_FILE.match(name)
+            if match and match.group(1) in stamps:
+                expired.append(name)
+
+        deleted = 0
+        for name in expired:
+            try:
+                os.remove(os.path.join(self.data_dir, name))
+                deleted += 1
+            except OSError:
+                pass
+
+        self.rebuild_manifest()
+        return archived, deleted
+
+
+# Run the retention job if executed directly
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Roll old news_data snapshots up into monthly archives")
+    parser.add_argument('--data-dir', default='news_data', help="directory holding the snapshots")
+    parser.add_argument('--hot-days', type=int, default=7, help="keep snapshots from this many days as they are")
+    args = parser.parse_args()
+
+    retention = NewsRetention(args.data_dir, args.hot_days)
+    archived, deleted = retention.compact()
+    print(f"Archived {archived} snapshots and deleted {deleted} files")
@@ -0,0 +1,190 @@
+import os
+import threading
+import uuid
+from datetime import date
+from urllib.parse import unquote
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from article_table import unique_url_rows
+
+# Columns stored inside the Parquet files; date and category live in the directory names
+FILE_SCHEMA = pa.schema([
+    ('headline', pa.string()),
+    ('summary', pa.string()),
+    ('url', pa.string()),
+    ('source', pa.string()),
+    ('timestamp', pa.timestamp('us', tz='UTC')),
+    ('story_id', pa.int64()),
+])
+
+PARTITION_SCHEMA = pa.schema([('date', pa.string()), ('category', pa.string())])
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor='hive')
+DATASET_SCHEMA = pa.unify_schemas([FILE_SCHEMA, PARTITION_SCHEMA])
+
+
+class ParquetArticleStore:
+    """Append-only article history partitioned by date and category
+
+    Each save adds new zstd-compressed Parquet files under
+    <root>/date=YYYY-MM-DD/category=<name>/ and never rewrites existing
+    ones. Reads with a date range or a category list only open the matching
+    partitions. Frequent small appends leave many small files behind, so
+    compact() merges the small files in each partition into one. It can run
+    on a background thread while the scraper keeps working.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.compression = 'zstd'
+        self.compression_level = 3
+        # Partitions with at least this many files smaller than target_file_bytes are merged
+        self.min_compact_files = 4
+        self.target_file_bytes = 64 * 1024 * 1024
+        self.compaction_lock = threading.Lock()
+        self.compaction_thread = None
+        os.makedirs(root, exist_ok=True)
+
+    def append(self, table, name=None):
+        """Write an Arrow table of articles (ArticleTable.to_arrow() layout) as new files
+
+        Files are named part-<name>-N.parquet. Appending again with the same
+        name replaces those files instead of adding more, which makes an
+        interrupted import safe to repeat. The default is a random name.
+        Each file is written under a hidden name and renamed when complete,
+        so compaction and readers never open a partial file.
+        """
+        if table.num_rows == 0:
+            return 0
+        columns = {name: table[name] for name in FILE_SCHEMA.names}
+        columns['source'] = pc.cast(columns['source'], pa.string())
+        columns['date'] = pc.cast(pc.cast(table['timestamp'], pa.date32()), pa.string())
+        columns['category'] = pc.cast(table['category'], pa.string())
+        data = pa.table(columns).cast(DATASET_SCHEMA)
+
+        written = []
+        ds.write_dataset(
+            data,
+            self.root,
+            format='parquet',
+            partitioning=PARTITIONING,
+            basename_template=f".part-{name or uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+            file_options=ds.ParquetFileFormat().make_write_options(
+                compression=self.compression, compression_level=self.compression_level
+            ),
+            file_visitor=lambda written_file: written.append(written_file.path),
+        )
+        for path in written:
+            directory, hidden_name = os.path.split(path)
+            os.replace(path, os.path.join(directory, hidden_name[1:]))
+        return table.num_rows
+
+    def dataset(self):
+        """Open the store as a pyarrow dataset"""
+        return ds.dataset(self.root, format='parquet', partitioning=PARTITIONING, schema=DATASET_SCHEMA)
+
+    def read(self, start_date=None, end_date=None, categories=None, columns=None):
+        """Read articles as a DataFrame, opening only the partitions that match the filters
+
+        start_date and end_date are inclusive dates (date objects or
+        'YYYY-MM-DD' strings).
+        """
+        condition = None
+        if start_date is not None:
+            condition = ds.field('date') >= str(start_date)
+        if end_date is not None:
+            upper = ds.field('date') <= str(end_date)
+            condition = upper if condition is None else condition & upper
+        if categories:
+            chosen = ds.field('category').isin(list(categories))
+            condition = chosen if condition is None else condition & chosen
+
+        table = self.dataset().to_table(filter=condition, columns=columns)
+        if 'date' in table.column_names:
+            table = table.drop_columns(['date'])
+        df = table.to_pandas()
+        for column in ('source', 'category'):
+            if column in df.columns:
+                df[column] = df[column].astype('category')
+        return df
+
+    def partitions(self):
+        """List (date, category, directory) for every partition on disk"""
+        found = []
+        for date_dir in sorted(os.listdir(self.root)):
+            if not date_dir.startswith('date='):
+                continue
+            for category_dir in sorted(os.listdir(os.path.join(self.root, date_dir))):
+                if category_dir.startswith('category='):
+                    found.append((date_dir[5:], unquote(category_dir[9:]), os.path.join(self.root, date_dir, category_dir)))
+        return found
+
+    def dates(self):
+        """Return the sorted dates that have articles"""
+        return sorted({date.fromisoformat(day) for day, _, _ in self.partitions()})
+
+    def categories(self):
+        """Return the sorted categories that have articles"""
+        return sorted({category for _, category, _ in self.partitions()})
+
+    def compact_partition(self, directory):
+        """Merge the small files of one partition into a single file, returning how many were merged
+
+        The merged file keeps one row per URL (see unique_url_rows), drops
+        URLs already stored in the partition's large files and keeps every
+        row without a URL. Rows written twice (an interrupted compaction that
+        swapped in its merged file but did not remove the originals, or a
+        repeated import batch whose earlier files were already merged) are
+        cleaned up by the next compaction.
+        """
+        small = []
+        large = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith('.parquet') and not name.startswith(('.', '_')):
+                (small if os.path.getsize(path) < self.target_file_bytes else large).append(path)
+        if len(small) < self.min_compact_files:
+            return 0
+
+        table = ds.dataset(small, format='parquet', schema=FILE_SCHEMA).to_table().sort_by('timestamp')
+        table = table.take(unique_url_rows(table.select(['url', 'summary', 'timestamp']).to_pandas()))
+        if large:
+            stored = ds.dataset(large, format='parquet', schema=FILE_SCHEMA).to_table(columns=['url'])['url'].combine_chunks()
+            # Articles without a URL cannot be matched and are always kept
+            urls = pc.fill_null(table['url'], '')
+            table = table.filter(pc.invert(pc.and_(pc.is_in(urls, value_set=stored), pc.not_equal(urls, ''))))
+
+        # Hidden names are ignored by readers until the merged file is complete
+        merged_name = f"part-{uuid.uuid4().hex}-0.parquet"
+        tmp_path = os.path.join(directory, '.' + merged_name)
+        pq.write_table(table, tmp_path, compression=self.compression, compression_level=self.compression_level)
+        os.replace(tmp_path, os.path.join(directory, merged_name))
+        for path in small:
+            os.remove(path)
+        return len(small)
+
+    def compact(self):
+        """Merge small files in every partition; returns the number of files merged"""
+        with self.compaction_lock:
+            merged = 0
+            for _, _, directory in self.partitions():
+                merged += self.compact_partition(directory)
+            return merged
+
+    def compact_in_background(self):
+        """Start compact() on a background thread unless one is already running"""
+        if self.compaction_thread is not None and self.compaction_thread.is_alive():
+            return self.compaction_thread
+        self.compaction_thread = threading.Thread(target=self.compact, name='parquet-compaction')
+        self.compaction_thread.start()
+        return self.compaction_thread
+
+
+# Compact the store if executed directly
+if __name__ == "__main__":
+    store = ParquetArticleStore(os.path.join('news_data', 'articles'))
+    print(f"Merged {store.compact()} files")
@@ -0,0 +1,162 @@
+import heapq
+import random
+import time
+from datetime import datetime
+
+from rss_scraper import RSSNewsScraperMultiSource
+
+
+class AdaptivePollingDaemon:
+    """Long-running scraper that polls each feed on its own learned interval
+
+    Feeds sit in a priority queue ordered by their next poll time. After every
+    poll the daemon counts entries it had not seen in the previous poll, keeps
+    an exponentially weighted estimate of how many new entries the feed
+    publishes per second, and schedules the next poll so that roughly
+    target_new_entries have appeared by then. Busy feeds (G1, Google News) are
+    therefore polled every few minutes while quiet ones (IMF, UN News) back off
+    to hours. Learned intervals are kept in the scraper's feed state file so
+    they survive restarts.
+    """
+
+    def __init__(self, scraper=None):
+        self.scraper = scraper or RSSNewsScraperMultiSource()
+
+        # Polling interval bounds and targets (seconds)
+        self.min_interval = 120
+        self.max_interval = 6 * 3600
+        self.initial_interval = 900
+        self.target_new_entries = 3
+        self.rate_smoothing = 0.3
+        self.jitter = 0.1
+
+        # Feeds due within this window are fetched together in one batch
+        self.batch_window = 5
+
+        # How often collected articles are written out
+        self.save_interval = 900
+
+        self.queue = []
+        self.sequence = 0
+        self.previous_links = {}
+        self.last_save = time.time()
+
+    def log(self, message, level='info'):
+        """Log through the scraper's logger"""
+        self.scraper.log(message, level)
+
+    def schedule(self, category, feed, when):
+        """Put a feed back on the priority queue"""
+        self.sequence += 1
+        heapq.heappush(self.queue, (when, self.sequence, category, feed))
+
+    def load_schedule(self):
+        """Queue every configured feed, resuming saved poll times where available"""
+        now = time.time()
+        for category, feeds in self.scraper.rss_feeds.items():
+            for feed in feeds:
+                state = self.scraper.feed_state.get(feed['url'])
+                self.schedule(category, feed, min(state.get('next_poll', now), now + self.max_interval))
+
+    def next_interval(self, feed_url, new_entries, elapsed):
+        """Update the feed's entry rate estimate and return its next polling interval"""
+        state = self.scraper.feed_state.get(feed_url)
+        rate = state.get('entry_rate')
+
+        if elapsed is not None and elapsed > 0:
+            observed = new_entries / elapsed
+            rate = observed if rate is None else (
+                self.rate_smoothing * observed + (1 - self.rate_smoothing) * rate
+            )
+
+        if rate is None:
+            interval = self.initial_interval
+        elif rate <= 0:
+            interval = self.max_interval
+        else:
+            interval = self.target_new_entries / rate
+        interval = min(self.max_interval, max(self.min_interval, interval))
+
+        # Spread polls out so feeds with equal rates do not stay in lockstep
+        interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+
+        self.scraper.feed_state.update(feed_url, entry_rate=rate, poll_interval=round(interval))
+        return interval
+
+    def poll_due_feeds(self):
+        """Fetch every feed that is due and reschedule it"""
+        now = time.time()
+        due = []
+        while self.queue and self.queue[0][0] <= now + self.batch_window:
+            _, _, category, feed = heapq.heappop(self.queue)
+            due.append((category, feed))
+
+        self.log(f"Polling {len(due)} due feeds")
+        results = self.scraper.run_feed_jobs(due)
+
+        finished = time.time()
+        for (category, feed), articles in zip(due, results):
+            feed_url = feed['url']
+            state = self.scraper.feed_state.get(feed_url)
+            links = {article['url'] for article in articles}
+
+            # Without a previous poll in this process there is nothing to compare against
+            previous = self.previous_links.get(feed_url)
+            elapsed = None
+            new_entries = 0
+            if previous is not None and state.get('last_poll'):
+                new_entries = len(links - previous)
+                elapsed = finished - state['last_poll']
+            if articles:
+                self.previous_links[feed_url] = links
+            elif previous is None:
+                self.previous_links[feed_url] = set()
+
+            interval = self.next_interval(feed_url, new_entries, elapsed)
+            self.scraper.feed_state.update(feed_url, last_poll=finished, next_poll=finished + interval)
+            self.schedule(category, feed, finished + interval)
+
+            self.scraper.add_articles(articles)
+
+        self.scraper.save_feed_state()
+
+    def save_collected(self):
+        """Write out the articles collected since the last save"""
+        if self.scraper.all_articles:
+            self.scraper.remove_duplicates()
+            self.scraper.save_results()
+            self.scraper.all_articles.clear()
+        self.last_save = time.time()
+
+    def run(self):
+        """Poll feeds until interrupted"""
+        # Fork the parse workers before the fetch, writer and compaction threads exist
+        self.scraper.get_parse_pool()
+        self.load_schedule()
+        self.log(f"Daemon started with {len(self.queue)} feeds")
+
+        try:
+            while self.queue:
+                delay = self.queue[0][0] - time.time()
+                if delay > 0:
+                    # Wake up early if a save is due before the next poll
+                    time.sleep(min(delay, max(1, self.last_save + self.save_interval - time.time())))
+                else:
+                    self.poll_due_feeds()
+
+                if time.time() - self.last_save >= self.save_interval:
+                    self.save_collected()
+        except KeyboardInterrupt:
+            self.log("Daemon interrupted, saving collected articles")
+        finally:
+            self.save_collected()
+            self.scraper.close()
+            self.scraper.save_feed_state()
+            next_poll = datetime.fromtimestamp(self.queue[0][0]) if self.queue else None
+            self.log(f"Daemon stopped. Next poll was due at {next_poll}")
+
+
+# Run the daemon if executed directly
+if __name__ == "__main__":
+    daemon = AdaptivePollingDaemon()
+    daemon.run()
@@ -1,33 +1,215 @@
 import feedparser
-import pandas as pd
 import time
 import random
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_tz
 import re
+import math
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import logging
+import argparse
 import html
+import hashlib
 import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+from feed_state import FeedStateStore
+from host_scheduler import HostScheduler
+from fast_feed_parser import iter_feed_entries, UnsupportedFeed
+from article_table import ArticleTable, PYARROW_AVAILABLE
+from article_enricher import ArticleEnricher
+from seen_index import SeenIndex
+from near_duplicates import NearDuplicateIndex
+from story_clusters import StoryClusterer
+from article_db import ArticleDatabase, ArticleWriter, FTS5_AVAILABLE
+from url_utils import canonicalize_url
+from news_retention import NewsRetention
+
+# requests/urllib3 only decode Brotli responses when a brotli package is installed
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+# The Parquet article store needs pyarrow; without it results are saved as CSV
+try:
+    from parquet_store import ParquetArticleStore
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
 
 # Suppress the ScriptRunContext warnings
 warnings.filterwarnings("ignore", message=".*missing ScriptRunContext.*")
 
+# Root element name at the start of a feed body, after its prolog
+FEED_ROOT_TAG = re.compile(r'<([A-Za-z_][\w.:-]*)')
+
+# Byte order marks, and a leading '<' without one, of feeds that need decoding before sniffing
+FEED_HEAD_ENCODINGS = (
+    (b'\xef\xbb\xbf', 'utf-8'),
+    (b'\xff\xfe\x00\x00', 'utf-32-le'),
+    (b'\x00\x00\xfe\xff', 'utf-32-be'),
+    (b'\xff\xfe', 'utf-16-le'),
+    (b'\xfe\xff', 'utf-16-be'),
+    (b'<\x00\x00\x00', 'utf-32-le'),
+    (b'\x00\x00\x00<', 'utf-32-be'),
+    (b'<\x00', 'utf-16-le'),
+    (b'\x00<', 'utf-16-be'),
+)
+
+# Text cleaning patterns, compiled once for every headline and summary
+HTML_TAG = re.compile(r'<[^>]+>')
+DISALLOWED_CHARS = re.compile(r'[^\w\s.,;:!?\'"-]')
+
+# For pure ASCII text the character whitelist is a bytes.translate() deletion set
+ASCII_DISALLOWED = bytes(c for c in range(128) if DISALLOWED_CHARS.match(chr(c)))
+
+
+def normalize_text(text):
+    """Apply the clean_text steps to a string, skipping the ones that cannot change it"""
+    if '&' in text:
+        text = html.unescape(text)
+    if '<' in text:
+        text = HTML_TAG.sub('', text)
+    text = ' '.join(text.split())
+    if text.isascii():
+        return text.encode('ascii').translate(None, ASCII_DISALLOWED).decode('ascii').strip()
+    return DISALLOWED_CHARS.sub('', text).strip()
+
+
 class RSSNewsScraperMultiSource:
-    def __init__(self):
+    def __init__(self, parse_only=False):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept-Language': 'en-US,en;q=0.9,pt-BR;q=0.8,pt;q=0.7',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Referer': 'https://www.google.com/'
         }
-        self.all_articles = []
+        self.all_articles = ArticleTable()
+        
+        # Try the streaming RSS 2.0 / Atom parser before falling back to feedparser
+        self.fast_parse = True
+        
+        # Date formats tried when feedparser has not already parsed a date, after
+        # the format the source used last time
+        self.date_formats = [
+            'rfc822',                   # RFC 822 / RFC 2822, named or numeric zones
+            'iso8601',                  # ISO 8601 and 'YYYY-MM-DD HH:MM:SS'
+            '%d/%m/%Y %H:%M:%S',        # Day-first local format
+            '%a %b %d %H:%M:%S %z %Y'   # Twitter format
+        ]
+        
+        # On feeds seen to be sorted newest-first, stop after this many
+        # consecutive entries older than the cutoff (0 always reads every entry)
+        self.stop_after_old_entries = 5
+        
+        # Parse worker processes only need the parsing settings above and a logger
+        if parse_only:
+            self.logger = logging.getLogger('RSSNewsScraperLogger')
+            return
+        
+        # Concurrent fetching: global worker limit and per-host connection limit
+        self.concurrent = True
+        self.max_workers = 8
+        self.max_per_host = 2
+        
+        # Circuit breaker: skip a feed after this many consecutive failures,
+        # retrying with exponential backoff (seconds) and jitter
+        self.failure_threshold = 3
+        self.base_backoff = 15 * 60
+        self.max_backoff = 24 * 3600
+        
+        # CPU-bound feed parsing runs in this many worker processes (0 parses in-process).
+        # The pool is started once and reused by every run until close().
+        self.parse_workers = os.cpu_count() or 1
+        self.parse_pool = None
+        
+        # Per-host politeness: token buckets (requests per second, burst size and
+        # minimum seconds between requests), with stricter limits for some domains
+        self.default_host_limit = {'rate': 2.0, 'burst': 2, 'min_interval': 0.5}
+        self.host_rate_limits = {
+            'news.google.com': {'rate': 0.5, 'burst': 1, 'min_interval': 2.0}
+        }
+        self.host_scheduler = HostScheduler(self.default_host_limit, self.host_rate_limits)
+        
+        # Timeouts in seconds: connect/read per request (a feed entry may override them
+        # with 'connect_timeout' / 'read_timeout'), a hard cap on one feed download,
+        # and a deadline for a whole run after which collected results are returned
+        self.connect_timeout = 5
+        self.read_timeout = 15
+        self.feed_timeout = 30
+        self.run_deadline = 180
+        
+        # Largest decompressed feed body accepted (a feed entry may override it with
+        # 'max_bytes'); bigger or non-feed responses are rejected before parsing
+        self.max_feed_bytes = 5 * 1024 * 1024
+        
+        # Hedged requests: when a download is slower than this percentile of the
+        # feed's recent latencies, send a second request and use whichever finishes first
+        self.hedge_requests = False
+        self.hedge_percentile = 90
+        self.hedge_min_samples = 5
+        self.hedge_executor = None
+        
+        # One pooled keep-alive session shared by all feeds
+        self.session = self.create_session()
         
         # Create output directory if it doesn't exist
         self.output_dir = 'news_data'
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # Conditional GET: remember ETag / Last-Modified / body hash per feed across runs
+        self.use_conditional_get = True
+        self.feed_state = FeedStateStore(os.path.join(self.output_dir, 'feed_state.json'))
+        
+        # Cross-run dedup: only articles whose URL/GUID was never collected before are kept.
+        # Set seen_index_path to None to keep every article in the recency window.
+        self.seen_index_path = os.path.join(self.output_dir, 'seen_articles.sqlite')
+        self.seen_index = None
+        
+        # Collapse syndicated variants of the same headline (MinHash/LSH, Jaccard >= threshold).
+        # With near_duplicate_path set to None the index only lives for this run.
+        self.detect_near_duplicates = True
+        self.near_duplicate_threshold = 0.7
+        self.near_duplicate_path = os.path.join(self.output_dir, 'near_duplicates.sqlite')
+        self.near_duplicates = None
+        
+        # Group articles about the same event into stories (online clustering, cosine >= threshold).
+        # With story_cluster_path set to None the stories only live for this run.
+        self.cluster_stories = True
+        self.story_threshold = 0.25
+        self.story_cluster_path = os.path.join(self.output_dir, 'story_clusters.json')
+        self.story_clusters = None
+        
+        # Append-only article history partitioned by date and category (Parquet, zstd).
+        # With article_store_path set to None results are saved as timestamped CSV files.
+        self.article_store_path = os.path.join(self.output_dir, 'articles')
+        self.article_store = None
+        
+        # Also write each save as an uncompressed Arrow file the dashboard can memory-map
+        self.save_snapshots = PYARROW_AVAILABLE
+        # Lists saved snapshots in news_data/manifest.json; old ones are rolled up by news_retention.py
+        self.retention = NewsRetention(self.output_dir)
+        
+        # Full-text searchable copy of every saved article (SQLite FTS5)
+        self.article_db_path = os.path.join(self.output_dir, 'articles.sqlite')
+        self.article_db = None
+        # Hand each feed's articles to a background writer as soon as the feed is done,
+        # so a crash loses at most one batch instead of the whole run
+        self.write_behind = True
+        self.write_batch_size = 500
+        self.write_interval = 2.0
+        self.article_writer = None
+        
         # Set up logging
         self.setup_logging()
         
@@ -252,23 +434,26 @@ class RSSNewsScraperMultiSource:
         """Clean up text by removing HTML tags, decoding HTML entities, and normalizing whitespace"""
         if text is None:
             return ''
+        return normalize_text(str(text))
+    
+    def clean_texts(self, texts):
+        """Clean a whole column of texts at once, giving the same results as clean_text
         
-        # Convert to string if not already
-        text = str(text)
-        
-        # Decode HTML entities
-        text = html.unescape(text)
-        
-        # Remove HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
-        
-        # Remove extra whitespace
-        text = ' '.join(text.split())
-        
-        # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s.,;:!?\'"-]', '', text)
-        
-        return text.strip()
+        Repeated values (the same source blurb or boilerplate summary on every
+        entry) are only cleaned once.
+        """
+        cleaned = {}
+        results = []
+        for text in texts:
+            if text is None:
+                results.append('')
+                continue
+            text = str(text)
+            value = cleaned.get(text)
+            if value is None:
+                value = cleaned[text] = normalize_text(text)
+            results.append(value)
+        return results
     
     def create_simple_summary(self, text, max_length=200):
         """Create a simple summary by truncating text to specified length"""
@@ -300,147 +485,518 @@ class RSSNewsScraperMultiSource:
         # If no space found, just truncate and add ellipsis
         return clean_text[:max_length] + '...'
     
-    def is_recent_entry(self, entry, days=2):
-        """Check if an entry is within the specified number of days"""
+    def parse_date_string(self, value, date_format):
+        """Parse a date string with one named format, returning a UTC datetime or None
+        
+        'rfc822' and 'iso8601' use parsers that report failure without raising;
+        any other name is a strptime format.
+        """
+        if date_format == 'rfc822':
+            parts = parsedate_tz(value)
+            if parts is None:
+                return None
+            try:
+                date_obj = datetime(*parts[:6], tzinfo=timezone(timedelta(seconds=parts[9] or 0)))
+            except (ValueError, OverflowError):
+                # Out-of-range fields (day 32, hour 24, offsets of a day or more)
+                return None
+        elif date_format == 'iso8601':
+            if not value[:4].isdigit():
+                return None
+            try:
+                date_obj = datetime.fromisoformat(value)
+            except ValueError:
+                return None
+        else:
+            try:
+                date_obj = datetime.strptime(value, date_format)
+            except ValueError:
+                return None
+
+        # Whole seconds, like feedparser's struct_time, so both parse paths agree
+        date_obj = date_obj.replace(microsecond=0)
+        # Dates without an offset are taken as UTC
+        if date_obj.tzinfo is None:
+            return date_obj.replace(tzinfo=timezone.utc)
+        try:
+            return date_obj.astimezone(timezone.utc)
+        except OverflowError:
+            return None
+    
+    def parse_entry_date(self, entry, date_format=None):
+        """Normalize an entry's publication date to a timezone-aware UTC datetime
+        
+        feedparser's pre-parsed struct_time is used when it exists. Otherwise
+        the date string is parsed with date_format first (the format this
+        source used last time) before trying the others. Returns the datetime
+        (None if the entry has no usable date) and the format that parsed it,
+        so callers can pass it back in for the next entry.
+        """
         # Try different date fields
-        pub_date = None
-        if hasattr(entry, 'published'):
-            pub_date = entry.published
-        elif hasattr(entry, 'pubDate'):
-            pub_date = entry.pubDate
-        elif hasattr(entry, 'updated'):
-            pub_date = entry.updated
+        for field in ('published', 'pubDate', 'updated'):
+            if hasattr(entry, field):
+                pub_date = getattr(entry, field)
+                break
+        else:
+            return None, date_format
+        
+        parsed = entry.get(f'{field}_parsed') if field != 'pubDate' else None
+        if parsed:
+            return datetime(*parsed[:6], tzinfo=timezone.utc), date_format
         
         if not pub_date:
-            # If no date found, assume it's recent
-            return True
+            return None, date_format
+        pub_date = pub_date.strip()
         
-        try:
-            # Try to parse the date
-            date_obj = None
+        if date_format:
+            date_obj = self.parse_date_string(pub_date, date_format)
+            if date_obj is not None:
+                return date_obj, date_format
+        
+        for candidate in self.date_formats:
+            if candidate == date_format:
+                continue
+            date_obj = self.parse_date_string(pub_date, candidate)
+            if date_obj is not None:
+                return date_obj, candidate
+        
+        return None, date_format
+    
+    def create_session(self):
+        """Create a pooled keep-alive HTTP session that sends the configured headers"""
+        session = requests.Session()
+        session.headers.update(self.headers)
+        session.headers['Accept-Encoding'] = 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate'
+        
+        # Keep enough idle connections per host for every concurrent worker
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=max(self.max_workers, 10))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def get_feed_setting(self, feed_url, key, default):
+        """Return a per-feed override from rss_feeds, or the scraper-wide default"""
+        for feeds in self.rss_feeds.values():
+            for feed in feeds:
+                if feed['url'] == feed_url:
+                    return feed.get(key, default)
+        return default
+    
+    def get_feed_timeouts(self, feed_url):
+        """Return the (connect, read) timeouts for a feed, honouring per-feed overrides"""
+        return (self.get_feed_setting(feed_url, 'connect_timeout', self.connect_timeout),
+                self.get_feed_setting(feed_url, 'read_timeout', self.read_timeout))
+    
+    def check_feed_content_type(self, content_type):
+        """Reject responses whose declared type can never be a feed (images, PDFs, JSON...)"""
+        media_type = content_type.split(';')[0].strip().lower()
+        if not media_type:
+            return
+        if media_type.startswith(('image/', 'audio/', 'video/', 'font/')) or media_type in (
+            'application/pdf', 'application/json', 'application/zip', 'application/octet-stream'
+        ):
+            raise ValueError(f"not a feed: content type {media_type}")
+    
+    def sniff_feed_body(self, head):
+        """Check the first bytes of a body and reject documents that are not RSS/Atom feeds
+        
+        Servers often label feeds as text/html or text/plain, so the markup
+        itself decides. The XML declaration, comments, processing
+        instructions (<?xml-stylesheet?>) and a non-HTML DOCTYPE are skipped,
+        then the root element is checked: rss, feed, rdf:RDF and channel are
+        accepted, HTML pages, sitemaps and other roots are rejected. When the
+        prolog runs past the sniffed bytes the check is inconclusive and the
+        body is left to the parser.
+        """
+        text = self.decode_feed_head(head).lstrip('\ufeff \t\r\n')
+        if not text.startswith('<'):
+            raise ValueError("not a feed: body does not start with markup")
+        
+        position = 0
+        while True:
+            while position < len(text) and text[position] in ' \t\r\n':
+                position += 1
+            if position >= len(text):
+                return
+            if text.startswith('<?', position):
+                end = text.find('?>', position)
+                if end < 0:
+                    return
+                position = end + 2
+            elif text.startswith('<!--', position):
+                end = text.find('-->', position)
+                if end < 0:
+                    return
+                position = end + 3
+            elif text[position:position + 9].lower() == '<!doctype':
+                if text[position + 9:position + 14].strip().lower().startswith('html'):
+                    raise ValueError("not a feed: body is an HTML page or sitemap")
+                # Skip an internal subset ([...]) before the closing '>'
+                subset = text.find('[', position)
+                close = text.find('>', position)
+                if 0 <= subset < close:
+                    close = text.find(']', subset)
+                    close = text.find('>', close) if close >= 0 else -1
+                if close < 0:
+                    return
+                position = close + 1
+            else:
+                break
+        
+        match = FEED_ROOT_TAG.match(text, position)
+        if match is None:
+            raise ValueError("not a feed: no rss, feed or rdf root element")
+        root = match.group(1).lower()
+        if root in ('html', 'head', 'body', 'sitemapindex', 'urlset'):
+            raise ValueError("not a feed: body is an HTML page or sitemap")
+        if root not in ('rss', 'feed', 'rdf:rdf', 'channel') and not root.endswith((':rss', ':feed', ':rdf')):
+            raise ValueError(f"not a feed: root element is <{match.group(1)}>, not rss, feed or rdf")
+    
+    def decode_feed_head(self, head):
+        """Decode the first bytes of a body for sniffing, recognizing UTF-16 and UTF-32 bodies"""
+        for prefix, encoding in FEED_HEAD_ENCODINGS:
+            if head.startswith(prefix):
+                return head.decode(encoding, errors='ignore')
+        # Every ASCII-compatible encoding maps markup bytes to the same characters
+        return head.decode('latin-1')
+    
+    def get_hedge_delay(self, feed_url):
+        """Return how long to wait before hedging a request, or None if it should not be hedged"""
+        if not self.hedge_requests:
+            return None
+        history = self.feed_state.get(feed_url).get('latency_history') or []
+        if len(history) < self.hedge_min_samples:
+            return None
+        ordered = sorted(history)
+        rank = max(0, math.ceil(self.hedge_percentile / 100 * len(ordered)) - 1)
+        return ordered[rank]
+    
+    def request_feed(self, feed_url, request_headers):
+        """Perform one GET for a feed within its timeouts and size cap
+        
+        The body is streamed and decompressed chunk by chunk. Oversized
+        responses are abandoned as soon as they cross max_feed_bytes and
+        non-feed documents are rejected from their content type and first
+        bytes, so memory stays bounded whatever the server sends.
+        """
+        deadline = time.monotonic() + self.feed_timeout
+        max_bytes = self.get_feed_setting(feed_url, 'max_bytes', self.max_feed_bytes)
+        response = self.session.get(
+            feed_url, headers=request_headers, timeout=self.get_feed_timeouts(feed_url), stream=True
+        )
+        with response:
+            response_headers = {k.lower(): v for k, v in response.headers.items()}
+            if response.status_code == 304:
+                return 304, b'', response_headers
+            response.raise_for_status()
             
-            # Try different date formats
-            formats_to_try = [
-                '%a, %d %b %Y %H:%M:%S %z',  # RFC 822
-                '%a, %d %b %Y %H:%M:%S %Z',  # RFC 822 with timezone name
-                '%Y-%m-%dT%H:%M:%S%z',      # ISO 8601
-                '%Y-%m-%dT%H:%M:%SZ',       # ISO 8601 UTC
-                '%Y-%m-%d %H:%M:%S',        # Basic format
-                '%a %b %d %H:%M:%S %z %Y'   # Twitter format
-            ]
+            self.check_feed_content_type(response_headers.get('content-type', ''))
+            content_length = response_headers.get('content-length', '')
+            if content_length.isdigit() and int(content_length) > max_bytes:
+                raise ValueError(f"feed is {int(content_length)} bytes, over the {max_bytes} byte limit")
             
-            for fmt in formats_to_try:
-                try:
-                    date_obj = datetime.strptime(pub_date, fmt)
-                    break
-                except:
+            # Read in chunks so a server trickling bytes cannot exceed the feed timeout
+            chunks = []
+            size = 0
+            sniffed = False
+            for chunk in response.iter_content(chunk_size=65536):
+                if time.monotonic() > deadline:
+                    raise requests.Timeout(f"download took longer than {self.feed_timeout}s")
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"feed exceeded the {max_bytes} byte limit")
+                if not sniffed and size >= 2048:
+                    self.sniff_feed_body(b''.join(chunks)[:2048])
+                    sniffed = True
+        
+        body = b''.join(chunks)
+        if not sniffed:
+            self.sniff_feed_body(body[:2048])
+        
+        # The body is already decompressed; drop the encoding so feedparser does not try again
+        response_headers.pop('content-encoding', None)
+        return response.status_code, body, response_headers
+    
+    def download_feed(self, feed_url):
+        """Download a feed body, sending the stored validators as a conditional GET
+        
+        Returns a (status, body, response_headers) tuple. A 304 response has an empty body.
+        With hedge_requests enabled, a request that is slower than the feed's
+        usual latency gets a second copy sent if the host scheduler has a
+        token to spare, and the first successful response wins.
+        """
+        request_headers = {}
+        if self.use_conditional_get:
+            state = self.feed_state.get(feed_url)
+            if state.get('etag'):
+                request_headers['If-None-Match'] = state['etag']
+            if state.get('last_modified'):
+                request_headers['If-Modified-Since'] = state['last_modified']
+        
+        hedge_delay = self.get_hedge_delay(feed_url)
+        if hedge_delay is None:
+            return self.request_feed(feed_url, request_headers)
+        
+        if self.hedge_executor is None:
+            self.hedge_executor = ThreadPoolExecutor(max_workers=self.max_workers * 2,
+                                                     thread_name_prefix='rss-hedge')
+        futures = [self.hedge_executor.submit(self.request_feed, feed_url, request_headers)]
+        done, _ = wait(futures, timeout=hedge_delay)
+        if not done and self.host_scheduler.try_acquire(self.get_feed_host(feed_url)) == 0:
+            self.log(f"Sending hedged request for {feed_url} after {hedge_delay:.2f}s")
+            futures.append(self.hedge_executor.submit(self.request_feed, feed_url, request_headers))
+        
+        error = None
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                futures.remove(future)
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+    
+    def fetch_feed(self, feed_url, source_name):
+        """Download a feed, returning its raw body or None when it is unchanged since the last run"""
+        self.log(f"Fetching RSS feed: {feed_url} for {source_name}")
+        
+        # Download the feed, skipping the parse when nothing changed since the last run
+        started = time.monotonic()
+        status, body, response_headers = self.download_feed(feed_url)
+        latency = time.monotonic() - started
+        checked_at = datetime.now().isoformat(timespec='seconds')
+        if status == 304:
+            self.log(f"Feed not modified since last run for {source_name}")
+            self.feed_state.update(feed_url, status=status, checked_at=checked_at)
+            self.record_feed_success(feed_url, latency)
+            return None
+        
+        body_hash = hashlib.sha256(body).hexdigest()
+        if self.use_conditional_get and body_hash == self.feed_state.get(feed_url).get('body_hash'):
+            self.log(f"Feed body unchanged since last run for {source_name}")
+            self.feed_state.update(feed_url, status=status, checked_at=checked_at)
+            self.record_feed_success(feed_url, latency)
+            return None
+        
+        return {
+            'status': status,
+            'body': body,
+            'headers': response_headers,
+            'body_hash': body_hash,
+            'checked_at': checked_at,
+            'latency': latency
+        }
+    
+    def remember_parsed_feed(self, feed_url, payload, feed_info):
+        """Store what was learned from a parsed feed for the next run
+        
+        The validators allow a conditional GET, the entry order decides
+        whether parsing may stop early and the date format is tried first
+        next time. A feed is only marked newest-first while every parse keeps
+        confirming it.
+        """
+        # A body without any entries (HTML error page, sitemap) counts as a failure,
+        # and its validators are not kept so it is never mistaken for an unchanged feed
+        if not feed_info['entries']:
+            self.record_feed_failure(feed_url, 'no feed entries in response', payload['latency'])
+            return
+        
+        fields = {
+            'etag': payload['headers'].get('etag'),
+            'last_modified': payload['headers'].get('last-modified'),
+            'status': payload['status'],
+            'body_hash': payload['body_hash'],
+            'checked_at': payload['checked_at']
+        }
+        if feed_info['newest_first'] is not None:
+            fields['newest_first'] = feed_info['newest_first']
+        if feed_info['date_format']:
+            fields['date_format'] = feed_info['date_format']
+        self.feed_state.update(feed_url, **fields)
+        self.record_feed_success(feed_url, payload['latency'])
+    
+    def get_feed_hints(self, feed_url):
+        """Return what earlier parses learned about a feed: entry order and date format"""
+        state = self.feed_state.get(feed_url)
+        return {
+            'newest_first': state.get('newest_first', False),
+            'date_format': state.get('date_format')
+        }
+    
+    def record_feed_success(self, feed_url, latency):
+        """Reset a feed's failure count and fold the latency into its running mean"""
+        state = self.feed_state.get(feed_url)
+        mean_latency = state.get('mean_latency')
+        if mean_latency is None:
+            mean_latency = latency
+        else:
+            mean_latency = 0.3 * latency + 0.7 * mean_latency
+        history = (state.get('latency_history') or [])[-19:] + [round(latency, 3)]
+        self.feed_state.update(
+            feed_url,
+            consecutive_failures=0,
+            open_until=None,
+            last_success=time.time(),
+            mean_latency=round(mean_latency, 3),
+            latency_history=history
+        )
+    
+    def record_feed_failure(self, feed_url, error, latency=None):
+        """Count a failed fetch and open the circuit breaker once a feed keeps failing
+        
+        After failure_threshold consecutive failures the feed is skipped for an
+        exponentially growing period (base_backoff doubled per extra failure,
+        capped at max_backoff) with random jitter so retries do not line up.
+        """
+        state = self.feed_state.get(feed_url)
+        failures = state.get('consecutive_failures', 0) + 1
+        fields = {
+            'consecutive_failures': failures,
+            'last_failure': time.time(),
+            'last_error': str(error)[:200]
+        }
+        if latency is not None:
+            fields['last_latency'] = round(latency, 3)
+        
+        if failures >= self.failure_threshold:
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (failures - self.failure_threshold))
+            backoff *= random.uniform(0.5, 1.0)
+            fields['open_until'] = time.time() + backoff
+            self.log(f"Feed {feed_url} failed {failures} times in a row, skipping it for {backoff / 60:.0f} minutes", 'warning')
+        self.feed_state.update(feed_url, **fields)
+    
+    def feed_is_available(self, feed_url):
+        """Check whether a feed's circuit breaker allows fetching it now"""
+        open_until = self.feed_state.get(feed_url).get('open_until')
+        return not open_until or time.time() >= open_until
+    
+    def parse_feed(self, body, response_headers, source_name, category, feed_hints=None):
+        """Parse a raw feed body and extract article information
+        
+        feed_hints carries what earlier runs learned about the feed (see
+        get_feed_hints). Returns the articles together with a dict of facts
+        learned this time: whether the entries were in newest-first order and
+        which date format they use. When the feed is known to be
+        newest-first, parsing stops after stop_after_old_entries consecutive
+        entries older than the cutoff.
+        """
+        articles = None
+        if self.fast_parse:
+            try:
+                articles, feed_info = self.process_entries(
+                    iter_feed_entries(body, response_headers), source_name, category, feed_hints
+                )
+                if not feed_info['entries']:
+                    raise UnsupportedFeed('no entries found by the fast parser')
+            except UnsupportedFeed as e:
+                self.log(f"Using feedparser for {source_name}: {str(e)}")
+                articles = None
+        
+        if articles is None:
+            entries = feedparser.parse(body, response_headers=response_headers).entries
+            articles, feed_info = self.process_entries(entries, source_name, category, feed_hints)
+        
+        if not feed_info['entries']:
+            self.log(f"No entries found in feed for {source_name}", 'warning')
+            return [], feed_info
+        
+        self.log(f"Found {feed_info['entries']} entries in feed for {source_name}")
+        if feed_info['stopped_early']:
+            self.log(f"Stopped reading {source_name} early: the remaining entries are older than the cutoff")
+        self.log(f"Successfully processed {len(articles)} articles from {source_name}")
+        return articles, feed_info
+    
+    def process_entries(self, entries, source_name, category, feed_hints=None):
+        """Turn an iterable of feed entries into article records, stopping early on sorted feeds"""
+        feed_hints = feed_hints or {}
+        stop_after = self.stop_after_old_entries if feed_hints.get('newest_first') else 0
+        fetched_at = datetime.now(timezone.utc).replace(microsecond=0)
+        cutoff_date = fetched_at - timedelta(days=2)
+        feed_info = {
+            'entries': 0,
+            'newest_first': None,
+            'stopped_early': False,
+            'date_format': feed_hints.get('date_format')
+        }
+        previous_date = None
+        consecutive_old = 0
+        
+        # Process entries (only those from the past 2 days)
+        articles = []
+        for entry in entries:
+            feed_info['entries'] += 1
+            try:
+                # Normalize the date once, and track whether the feed lists its entries newest-first
+                date_obj, feed_info['date_format'] = self.parse_entry_date(entry, feed_info['date_format'])
+                if date_obj is not None:
+                    if previous_date is not None:
+                        in_order = date_obj <= previous_date
+                        feed_info['newest_first'] = in_order and feed_info['newest_first'] is not False
+                    previous_date = date_obj
+                
+                # Skip if not recent, and stop once a sorted feed only has old entries left
+                if date_obj is not None and date_obj < cutoff_date:
+                    consecutive_old += 1
+                    if stop_after and consecutive_old >= stop_after and feed_info['newest_first'] is not False:
+                        feed_info['stopped_early'] = True
+                        break
                     continue
+                consecutive_old = 0
+                
+                # Extract data from entry
+                title = entry.title if hasattr(entry, 'title') else "No title"
+                link = entry.link if hasattr(entry, 'link') else ""
+                
+                # Try different fields for summary/description
+                summary = ""
+                if hasattr(entry, 'summary'):
+                    summary = entry.summary
+                elif hasattr(entry, 'description'):
+                    summary = entry.description
+                elif hasattr(entry, 'content'):
+                    # Some feeds use content instead of summary
+                    summary = entry.content[0].value if entry.content else ""
+                
+                # Text is cleaned for the whole feed at once below
+                articles.append({
+                    'headline': title,
+                    'summary': summary,
+                    'url': link,
+                    'source': source_name,
+                    'category': category,
+                    'timestamp': date_obj or fetched_at,
+                    'guid': entry.get('id', '')
+                })
             
-            # If no format worked, try email utils
-            if not date_obj:
-                try:
-                    from email.utils import parsedate_to_datetime
-                    date_obj = parsedate_to_datetime(pub_date)
-                except:
-                    # If all parsing fails, return True (assume it's recent)
-                    return True
-            
-            # Check if the entry is within the specified number of days
-            cutoff_date = datetime.now() - timedelta(days=days)
-            return date_obj >= cutoff_date
-            
-        except Exception as e:
-            self.log(f"Error parsing date: {pub_date} - {str(e)}", 'warning')
-            # If there's an error, return True (assume it's recent)
-            return True
+            except Exception as e:
+                self.log(f"Error processing entry for {source_name}: {str(e)}", 'error')
+        
+        # Clean headlines and summaries as two columns
+        headlines = self.clean_texts([article['headline'] for article in articles])
+        summaries = self.clean_texts([article['summary'] for article in articles])
+        for article, headline, summary in zip(articles, headlines, summaries):
+            article['headline'] = headline
+            article['summary'] = summary
+        
+        return articles, feed_info
     
     def get_feed_data(self, feed_url, source_name, category):
         """Parse RSS feed and extract article information"""
-        self.log(f"Fetching RSS feed: {feed_url} for {source_name}")
-        
         try:
-            # Add a small random delay to avoid too many simultaneous requests
-            time.sleep(random.uniform(0.5, 2))
-            
-            # Parse the feed
-            feed = feedparser.parse(feed_url)
-            
-            if not feed.entries:
-                self.log(f"No entries found in feed for {source_name}", 'warning')
+            payload = self.fetch_feed(feed_url, source_name)
+            if payload is None:
                 return []
             
-            self.log(f"Found {len(feed.entries)} entries in feed for {source_name}")
-            
-            # Process entries (only those from the past 2 days)
-            articles = []
-            for entry in feed.entries:
-                try:
-                    # Skip if not recent
-                    if not self.is_recent_entry(entry, days=2):
-                        continue
-                    
-                    # Extract data from entry
-                    title = entry.title if hasattr(entry, 'title') else "No title"
-                    link = entry.link if hasattr(entry, 'link') else ""
-                    
-                    # Try different fields for summary/description
-                    summary = ""
-                    if hasattr(entry, 'summary'):
-                        summary = entry.summary
-                    elif hasattr(entry, 'description'):
-                        summary = entry.description
-                    elif hasattr(entry, 'content'):
-                        # Some feeds use content instead of summary
-                        summary = entry.content[0].value if entry.content else ""
-                    
-                    # Clean the summary text
-                    summary = self.clean_text(summary)
-                    
-                    # Get publication date
-                    pub_date = None
-                    if hasattr(entry, 'published'):
-                        pub_date = entry.published
-                    elif hasattr(entry, 'pubDate'):
-                        pub_date = entry.pubDate
-                    elif hasattr(entry, 'updated'):
-                        pub_date = entry.updated
-                    
-                    # Format date or use current date
-                    if pub_date:
-                        try:
-                            # Try to parse the date, but use current date as fallback
-                            date_obj = datetime.strptime(pub_date, '%a, %d %b %Y %H:%M:%S %z')
-                            pub_date = date_obj.strftime("%Y-%m-%d")
-                        except:
-                            try:
-                                # Try alternative format
-                                from email.utils import parsedate_to_datetime
-                                date_obj = parsedate_to_datetime(pub_date)
-                                pub_date = date_obj.strftime("%Y-%m-%d")
-                            except:
-                                # If parsing fails, use the original string
-                                pass
-                    else:
-                        pub_date = datetime.now().strftime("%Y-%m-%d")
-                    
-                    # Add to articles list
-                    articles.append({
-                        'headline': self.clean_text(title),
-                        'summary': summary,
-                        'url': link,
-                        'source': source_name,
-                        'category': category,
-                        'timestamp': pub_date
-                    })
-                    
-                except Exception as e:
-                    self.log(f"Error processing entry for {source_name}: {str(e)}", 'error')
-            
-            self.log(f"Successfully processed {len(articles)} articles from {source_name}")
+            articles, feed_info = self.parse_feed(
+                payload['body'], payload['headers'], source_name, category, self.get_feed_hints(feed_url)
+            )
+            self.remember_parsed_feed(feed_url, payload, feed_info)
             return articles
             
         except Exception as e:
             self.log(f"Error fetching feed {feed_url} for {source_name}: {str(e)}", 'error')
+            self.record_feed_failure(feed_url, e)
             return []
     
     def scrape_category(self, category):
@@ -451,69 +1007,389 @@ class RSSNewsScraperMultiSource:
             self.log(f"Unknown category: {category}", 'error')
             return
         
-        for feed in self.rss_feeds[category]:
-            try:
-                feed_url = feed['url']
-                source_name = feed['source']
-                
-                # Get articles from this feed
-                articles = self.get_feed_data(feed_url, source_name, category)
-                
-                # Add to master list
-                self.all_articles.extend(articles)
-                
-            except Exception as e:
-                self.log(f"Error processing feed {feed} for category {category}: {str(e)}", 'error')
+        jobs = [(category, feed) for feed in self.rss_feeds[category]]
+        for articles in self.run_feed_jobs(jobs):
+            # Add to master list
+            self.add_articles(articles)
     
     def scrape_all_categories(self):
         """Scrape all categories defined in rss_feeds with no article limit"""
         self.log(f"Starting to scrape all categories for past 2 days")
         
+        jobs = []
         for category in self.rss_feeds.keys():
+            self.log(f"Scraping category: {category}")
+            jobs.extend((category, feed) for feed in self.rss_feeds[category])
+        
+        for articles in self.run_feed_jobs(jobs):
+            self.add_articles(articles)
+        
+        self.log(f"Completed scraping all categories. Collected {len(self.all_articles)} articles total.")
+    
+    def get_seen_index(self):
+        """Open the cross-run dedup index on first use (None when disabled)"""
+        if self.seen_index is None and self.seen_index_path:
+            self.seen_index = SeenIndex(self.seen_index_path)
+        return self.seen_index
+    
+    def get_near_duplicate_index(self):
+        """Open the near-duplicate headline index on first use (None when disabled)"""
+        if self.near_duplicates is None and self.detect_near_duplicates:
+            self.near_duplicates = NearDuplicateIndex(self.near_duplicate_path, threshold=self.near_duplicate_threshold)
+        return self.near_duplicates
+    
+    def get_story_clusterer(self):
+        """Load the story clusters on first use (None when disabled)"""
+        if self.story_clusters is None and self.cluster_stories:
+            self.story_clusters = StoryClusterer(self.story_cluster_path, threshold=self.story_threshold)
+        return self.story_clusters
+    
+    def add_articles(self, articles):
+        """Add a feed's articles to all_articles, skipping ones collected in earlier runs
+        and near-duplicate variants of stories already collected"""
+        seen_index = self.get_seen_index()
+        if seen_index is not None and articles:
+            new_articles = seen_index.filter_new(articles)
+            if len(new_articles) < len(articles):
+                self.log(f"Skipped {len(articles) - len(new_articles)} articles already collected")
+            articles = new_articles
+        
+        near_duplicates = self.get_near_duplicate_index()
+        if near_duplicates is not None and articles:
+            new_articles = near_duplicates.filter_new(articles)
+            if len(new_articles) < len(articles):
+                self.log(f"Skipped {len(articles) - len(new_articles)} near-duplicate headlines")
+            articles = new_articles
+        
+        story_clusters = self.get_story_clusterer()
+        if story_clusters is not None:
+            story_clusters.assign_articles(articles)
+        
+        article_writer = self.get_article_writer()
+        if article_writer is not None:
+            article_writer.submit(articles)
+        
+        # Still kept in memory for the run-level dedupe, enrichment and saving;
+        # only the daemon clears it (at every save), a single run holds it all
+        self.all_articles.extend(articles)
+        return len(articles)
+    
+    def get_feed_host(self, feed_url):
+        """Return the host name used to group requests for politeness limits"""
+        return urlparse(feed_url).netloc.lower()
+    
+    def fetch_feed_job(self, job):
+        """Fetch a single (category, feed) job, never raising"""
+        category, feed = job
+        try:
+            return self.get_feed_data(feed['url'], feed['source'], category)
+        except Exception as e:
+            self.log(f"Error processing feed {feed} for category {category}: {str(e)}", 'error')
+            return []
+    
+    def download_feed_job(self, job):
+        """Download stage of a (category, feed) job, never raising"""
+        category, feed = job
+        try:
+            return self.fetch_feed(feed['url'], feed['source'])
+        except Exception as e:
+            self.log(f"Error fetching feed {feed['url']} for {feed['source']}: {str(e)}", 'error')
+            self.record_feed_failure(feed['url'], e)
+            return None
+    
+    def parse_feed_job(self, job, payload, parse_future=None):
+        """Parse stage of a (category, feed) job, never raising
+        
+        When parse_future is given the feed was parsed in a worker process and
+        only its result is collected here.
+        """
+        category, feed = job
+        try:
+            if parse_future is not None:
+                articles, feed_info = parse_future.result()
+            else:
+                articles, feed_info = self.parse_feed(
+                    payload['body'], payload['headers'], feed['source'], category,
+                    self.get_feed_hints(feed['url'])
+                )
+            self.remember_parsed_feed(feed['url'], payload, feed_info)
+            return articles
+        except Exception as e:
+            self.log(f"Error parsing feed {feed['url']} for {feed['source']}: {str(e)}", 'error')
+            self.record_feed_failure(feed['url'], e)
+            return []
+    
+    def get_parse_pool(self):
+        """Start the worker processes that parse feed bodies on first use (None to parse in-process)
+        
+        The workers are started right away and reused by every later run.
+        Forking while other threads are running can copy locks they hold
+        into the children, so long-running callers (the daemon) start the
+        pool before anything else.
+        """
+        if self.parse_pool is None and (self.parse_workers or 0) > 1:
             try:
-                self.scrape_category(category)
+                self.parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers, initializer=init_parse_worker)
+                self.parse_pool.submit(int).result()
             except Exception as e:
-                self.log(f"Error scraping category {category}: {str(e)}", 'error')
+                self.log(f"Could not start parse workers, parsing in-process: {str(e)}", 'warning')
+                self.stop_parse_pool()
+                self.parse_workers = 0
+        return self.parse_pool
+    
+    def stop_parse_pool(self):
+        """Shut down the parse worker processes"""
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown(cancel_futures=True)
+            self.parse_pool = None
+    
+    def run_feed_jobs(self, jobs):
+        """Fetch a list of (category, feed) jobs and return their articles in job order
         
-        self.log(f"Completed scraping all categories. Collected {len(self.all_articles)} articles total.")
+        In concurrent mode the work runs as a two-stage pipeline. Threads
+        download feed bodies: at most max_workers feeds are in flight at once
+        and at most max_per_host of them target the same host. A job is only
+        handed to a thread once the host scheduler allows a request to its
+        host, so threads never sit idle waiting on politeness delays. Each
+        downloaded body is then queued to a pool of parse_workers processes
+        that run feedparser and the text cleaning outside the GIL. Results
+        are returned in the same order as the sequential mode so all_articles
+        is unchanged.
+        """
+        # Feeds whose circuit breaker is open are skipped until their backoff expires
+        available = [self.feed_is_available(feed['url']) for category, feed in jobs]
+        for (category, feed), ok in zip(jobs, available):
+            if not ok:
+                self.log(f"Skipping {feed['source']}: feed is failing, next retry after "
+                         f"{datetime.fromtimestamp(self.feed_state.get(feed['url'])['open_until']):%Y-%m-%d %H:%M}")
+        
+        deadline = time.monotonic() + self.run_deadline if self.run_deadline else None
+        
+        if not self.concurrent or self.max_workers <= 1:
+            results = []
+            for job, ok in zip(jobs, available):
+                if not ok or (deadline and time.monotonic() > deadline):
+                    results.append([])
+                    continue
+                self.host_scheduler.acquire(self.get_feed_host(job[1]['url']))
+                results.append(self.fetch_feed_job(job))
+            self.save_feed_state()
+            return results
+        
+        results = [[] for _ in jobs]
+        
+        # Queue jobs per host so a busy host never holds up the others
+        pending = {}
+        for index, (category, feed) in enumerate(jobs):
+            if not available[index]:
+                continue
+            pending.setdefault(self.get_feed_host(feed['url']), deque()).append(index)
+        
+        in_flight = {}
+        host_counts = {}
+        parsing = {}
+        timed_out = False
+        parse_pool = self.get_parse_pool() if len(jobs) > 1 else None
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='rss-fetch')
+        try:
+            while pending or in_flight or parsing:
+                # Past the run deadline, keep what has been collected and abandon the rest
+                remaining = deadline - time.monotonic() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    timed_out = True
+                    unfinished = sum(len(queue) for queue in pending.values()) + len(in_flight) + len(parsing)
+                    self.log(f"Run deadline of {self.run_deadline}s reached, returning without {unfinished} unfinished feeds", 'warning')
+                    break
+                
+                # Seconds until the next rate-limited host is allowed another request
+                next_ready = None
+                for host in list(pending):
+                    queue = pending[host]
+                    while (queue and len(in_flight) < self.max_workers
+                           and host_counts.get(host, 0) < self.max_per_host):
+                        delay = self.host_scheduler.try_acquire(host)
+                        if delay > 0:
+                            next_ready = delay if next_ready is None else min(next_ready, delay)
+                            break
+                        index = queue.popleft()
+                        future = executor.submit(self.download_feed_job, jobs[index])
+                        in_flight[future] = (index, host)
+                        host_counts[host] = host_counts.get(host, 0) + 1
+                    if not queue:
+                        del pending[host]
+                
+                timeout = next_ready
+                if remaining is not None:
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+                
+                if not in_flight and not parsing:
+                    time.sleep(timeout or 0)
+                    continue
+                
+                done, _ = wait(list(in_flight) + list(parsing), timeout=timeout,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in parsing:
+                        index, payload = parsing.pop(future)
+                        results[index] = self.parse_feed_job(jobs[index], payload, future)
+                        continue
+                    
+                    index, host = in_flight.pop(future)
+                    host_counts[host] -= 1
+                    payload = future.result()
+                    if payload is None:
+                        continue
+                    
+                    # Hand the body to the parse stage
+                    category, feed = jobs[index]
+                    if parse_pool is not None:
+                        try:
+                            parse_future = parse_pool.submit(
+                                parse_feed_in_worker, payload['body'], payload['headers'],
+                                feed['source'], category, self.get_feed_hints(feed['url'])
+                            )
+                            parsing[parse_future] = (index, payload)
+                            continue
+                        except Exception as e:
+                            self.log(f"Parse workers unavailable, parsing in-process from now on: {str(e)}", 'warning')
+                            self.stop_parse_pool()
+                            self.parse_workers = 0
+                            parse_pool = None
+                    results[index] = self.parse_feed_job(jobs[index], payload)
+        finally:
+            # Downloads left running after the deadline end on their own timeouts
+            executor.shutdown(wait=not timed_out, cancel_futures=True)
+            # The parse pool stays up for the next run; drop what this one left queued
+            for future in parsing:
+                future.cancel()
+        
+        self.save_feed_state()
+        return results
+    
+    def save_feed_state(self):
+        """Persist per-feed validators so the next run can use conditional GETs"""
+        try:
+            self.feed_state.save()
+        except Exception as e:
+            self.log(f"Error saving feed state: {str(e)}", 'error')
+    
+    def get_article_store(self):
+        """Open the Parquet article store on first use (None when disabled or pyarrow is missing)"""
+        if self.article_store is None and self.article_store_path and PARQUET_AVAILABLE:
+            self.article_store = ParquetArticleStore(self.article_store_path)
+        return self.article_store
+    
+    def get_article_db(self):
+        """Open the full-text article database on first use (None when disabled or FTS5 is missing)"""
+        if self.article_db is None and self.article_db_path and FTS5_AVAILABLE:
+            self.article_db = ArticleDatabase(self.article_db_path)
+        return self.article_db
+    
+    def get_article_writer(self):
+        """Start the write-behind article writer on first use (None when disabled)"""
+        if self.article_writer is None and self.write_behind:
+            article_db = self.get_article_db()
+            if article_db is not None:
+                self.article_writer = ArticleWriter(
+                    article_db, self.write_batch_size, self.write_interval, log=self.log
+                )
+        return self.article_writer
+    
+    def close(self):
+        """Write the articles still queued for the article database and stop the writer and worker pools"""
+        if self.article_writer is not None:
+            self.article_writer.close()
+            self.log(f"Wrote {self.article_writer.written} articles to {self.article_db_path}")
+            self.article_writer = None
+        self.stop_parse_pool()
+        if self.hedge_executor is not None:
+            # A losing hedged request finishes on its own timeouts
+            self.hedge_executor.shutdown(wait=False, cancel_futures=True)
+            self.hedge_executor = None
     
     def save_results(self):
-        """Save scraped articles to CSV files with error handling"""
+        """Save scraped articles to the article store (or CSV files) with error handling"""
         if not self.all_articles:
             self.log("No articles to save.", 'warning')
             return
         
         try:
-            # Create a timestamp for the filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            article_store = self.get_article_store()
+            if article_store is not None:
+                saved = article_store.append(self.all_articles.to_arrow())
+                self.log(f"Appended {saved} articles to {self.article_store_path}")
+                # Merge the small files left by frequent appends without holding up the run
+                article_store.compact_in_background()
+            else:
+                self.save_csv_snapshot()
             
-            # Save all articles to one file
-            df_all = pd.DataFrame(self.all_articles)
-            all_file = os.path.join(self.output_dir, f"all_news_{timestamp}.csv")
-            df_all.to_csv(all_file, index=False, encoding='utf-8-sig')
-            self.log(f"Saved all {len(self.all_articles)} articles to {all_file}")
+            if self.save_snapshots:
+                snapshot_file = os.path.join(self.output_dir, f"all_news_{datetime.now().strftime('%Y%m%d_%H%M%S')}.arrow")
+                self.all_articles.save_snapshot(snapshot_file)
+                self.retention.add_snapshot(os.path.basename(snapshot_file))
+                self.log(f"Saved snapshot of {len(self.all_articles)} articles to {snapshot_file}")
             
-            # Save separate files by category
-            categories = df_all['category'].unique()
-            for category in categories:
-                try:
-                    df_category = df_all[df_all['category'] == category]
-                    category_file = os.path.join(self.output_dir, f"{category.replace(' ', '_').lower()}_{timestamp}.csv")
-                    df_category.to_csv(category_file, index=False, encoding='utf-8-sig')
-                    self.log(f"Saved {len(df_category)} {category} articles to {category_file}")
-                except Exception as e:
-                    self.log(f"Error saving category {category}: {str(e)}", 'error')
+            # Index the articles for full-text search over the whole history
+            if self.article_writer is not None:
+                # Already streamed to the database feed by feed; wait for the last batch
+                self.article_writer.flush()
+            else:
+                article_db = self.get_article_db()
+                if article_db is not None:
+                    added = article_db.add_articles(self.all_articles)
+                    self.log(f"Indexed {added} articles in {self.article_db_path}")
+            
+            # The articles are on disk, so later runs can skip them
+            if self.seen_index is not None:
+                self.seen_index.commit()
+            if self.near_duplicates is not None:
+                self.near_duplicates.commit()
+            if self.story_clusters is not None:
+                self.story_clusters.save()
         
         except Exception as e:
             self.log(f"Error saving results: {str(e)}", 'error')
             # Try a simplified approach as fallback
             try:
                 simple_file = os.path.join(self.output_dir, "news_backup.csv")
-                pd.DataFrame(self.all_articles).to_csv(simple_file, index=False)
+                self.all_articles.to_frame().to_csv(simple_file, index=False)
                 self.log(f"Saved backup file to {simple_file}")
             except:
                 self.log("Critical failure: Could not save any results", 'error')
     
+    def save_csv_snapshot(self):
+        """Save all articles to one timestamped CSV file plus one file per category"""
+        # Create a timestamp for the filename
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        # Save all articles to one file
+        df_all = self.all_articles.to_frame()
+        all_file = os.path.join(self.output_dir, f"all_news_{timestamp}.csv")
+        df_all.to_csv(all_file, index=False, encoding='utf-8-sig')
+        self.retention.add_snapshot(os.path.basename(all_file))
+        self.log(f"Saved all {len(self.all_articles)} articles to {all_file}")
+        
+        # Save separate files by category
+        categories = df_all['category'].unique()
+        for category in categories:
+            try:
+                df_category = df_all[df_all['category'] == category]
+                category_file = os.path.join(self.output_dir, f"{category.replace(' ', '_').lower()}_{timestamp}.csv")
+                df_category.to_csv(category_file, index=False, encoding='utf-8-sig')
+                self.log(f"Saved {len(df_category)} {category} articles to {category_file}")
+            except Exception as e:
+                self.log(f"Error saving category {category}: {str(e)}", 'error')
+    
+    def enrich_articles(self):
+        """Replace short RSS summaries with summaries of the full article pages"""
+        if not self.all_articles:
+            return
+        enricher = ArticleEnricher(self, os.path.join(self.output_dir, 'article_cache.json'))
+        enriched = enricher.enrich(self.all_articles)
+        # Rows already written behind get their longer summaries as updates
+        if self.article_writer is not None and enriched:
+            self.article_writer.submit([self.all_articles.row(i) for i in enriched])
+    
     def remove_duplicates(self):
         """Remove duplicate articles based on URL and headline"""
         if not self.all_articles:
@@ -521,23 +1397,49 @@ class RSSNewsScraperMultiSource:
         
         self.log(f"Removing duplicates from {len(self.all_articles)} articles")
         
-        # Convert to DataFrame for easier deduplication
-        df = pd.DataFrame(self.all_articles)
-        
-        # Drop duplicates based on URL (most reliable method)
-        df_no_url_dupes = df.drop_duplicates(subset=['url'])
+        # Keep the first article per canonical URL (most reliable method), then
+        # drop repeated headlines (different URLs might have same content)
+        seen_urls = set()
+        seen_headlines = set()
+        keep = []
+        for i, (url, headline) in enumerate(zip(self.all_articles.urls, self.all_articles.headlines)):
+            url = canonicalize_url(url)
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+            if headline in seen_headlines:
+                continue
+            seen_headlines.add(headline)
+            keep.append(i)
         
-        # Also check for duplicates in headlines (different URLs might have same content)
-        df_no_dupes = df_no_url_dupes.drop_duplicates(subset=['headline'])
-        
-        # Convert back to list of dictionaries
-        self.all_articles = df_no_dupes.to_dict('records')
+        if len(keep) < len(self.all_articles):
+            self.all_articles.keep_rows(keep)
         
         self.log(f"After removing duplicates: {len(self.all_articles)} articles remain")
 
 
+# Scraper instance used by each parse worker process
+_parse_worker = None
+
+
+def init_parse_worker():
+    """Set up the lightweight scraper used by a parse worker process"""
+    global _parse_worker
+    _parse_worker = RSSNewsScraperMultiSource(parse_only=True)
+
+
+def parse_feed_in_worker(body, response_headers, source_name, category, feed_hints=None):
+    """Parse a downloaded feed body inside a parse worker process"""
+    return _parse_worker.parse_feed(body, response_headers, source_name, category, feed_hints)
+
+
 # Run the scraper if executed directly
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape news articles from RSS feeds")
+    parser.add_argument('--enrich', action='store_true',
+                        help="fetch article pages to summarize entries whose RSS summary is short")
+    args = parser.parse_args()
+    
     # Create scraper instance
     scraper = RSSNewsScraperMultiSource()
     
@@ -547,7 +1449,12 @@ if __name__ == "__main__":
     # Remove duplicate articles
     scraper.remove_duplicates()
     
+    # Fetch full articles for feeds that only ship a headline
+    if args.enrich:
+        scraper.enrich_articles()
+    
     # Save results
     scraper.save_results()
+    scraper.close()
     
     print(f"Scraping completed! Found {len(scraper.all_articles)} articles total.")
\ No newline at end of file
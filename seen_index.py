@@ -0,0 +1,103 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+from url_utils import canonicalize_url
+
+# SQLite limits the number of parameters in one statement
+LOOKUP_CHUNK = 500
+
+
+def key_hash(kind, value):
+    """Hash an article key to a signed 64-bit integer usable as an SQLite rowid"""
+    digest = hashlib.blake2b(f"{kind}:{value}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def article_keys(article):
+    """Return the hashes identifying an article (canonical URL, and GUID within its source)"""
+    keys = []
+    url = article.get('url')
+    if url:
+        keys.append(key_hash('url', canonicalize_url(url)))
+    guid = (article.get('guid') or '').strip()
+    if guid:
+        # GUIDs are only unique within a feed; many feeds just number their items
+        keys.append(key_hash('guid', f"{article.get('source') or ''}\0{guid}"))
+    return keys
+
+
+class SeenIndex:
+    """Persistent set of the article URLs and GUIDs collected in earlier runs
+
+    Each canonical URL and (source, GUID) pair is stored as a 64-bit hash
+    in the integer primary key of an SQLite table, so a lookup is a single
+    B-tree probe and the index stays small and fast at millions of entries. Keys found during
+    a run are kept in memory and only written by commit(), once the articles
+    they belong to have been saved.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS seen (hash INTEGER PRIMARY KEY, first_seen INTEGER NOT NULL)')
+        self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+
+    def lookup(self, hashes):
+        """Return the subset of hashes already stored on disk"""
+        hashes = list(hashes)
+        found = set()
+        for start in range(0, len(hashes), LOOKUP_CHUNK):
+            chunk = hashes[start:start + LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(f'SELECT hash FROM seen WHERE hash IN ({placeholders})', chunk)
+            found.update(row[0] for row in rows)
+        return found
+
+    def filter_new(self, articles, keys=None):
+        """Return the articles whose URL and GUID have never been seen, and mark all of them seen
+
+        Articles with neither a URL nor a GUID cannot be recognized later and
+        are always returned. keys can pass the article_keys() of each article
+        when they were already computed elsewhere (e.g. in a worker process).
+        """
+        if keys is None:
+            keys = [article_keys(article) for article in articles]
+        with self.lock:
+            candidates = {h for hashes in keys for h in hashes if h not in self.pending}
+            stored = self.lookup(candidates)
+
+            now = int(time.time())
+            new_articles = []
+            for article, hashes in zip(articles, keys):
+                seen = any(h in stored or h in self.pending for h in hashes)
+                # Remember every spelling of the article, including ones seen for the first time
+                for h in hashes:
+                    if h not in stored:
+                        self.pending.setdefault(h, now)
+                if not seen:
+                    new_articles.append(article)
+            return new_articles
+
+    def commit(self):
+        """Write the keys collected since the last commit to disk"""
+        with self.lock:
+            if not self.pending:
+                return
+            self.conn.executemany('INSERT OR IGNORE INTO seen (hash, first_seen) VALUES (?, ?)', self.pending.items())
+            self.conn.commit()
+            self.pending = {}
+
+    def close(self):
+        """Close the database connection, discarding uncommitted keys"""
+        with self.lock:
+            self.pending = {}
+            self.conn.close()
@@ -0,0 +1,167 @@
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+
+# Stories that are not saved number from a random offset in this range, so their
+# ids never clash with saved stories (numbered from 1) or with other unsaved runs
+UNSAVED_ID_RANGE = (1 << 40, 1 << 62)
+
+# Words of three or more letters; numbers and punctuation carry little topic signal
+TOKEN = re.compile(r'[^\W\d_]{3,}')
+
+STOPWORDS = frozenset('''
+    the and for with that from this have has are was were will would could should after over into
+    about more than says said its their there what when who how why new not but you your his her
+    they them been also just can may out off amid as up one two news report reports live update
+    para com uma que dos das nos nas pelo pela pelos pelas sobre como mais por entre após ser
+    são foi diz não sem seu sua seus suas ele ela eles elas este esta isso
+'''.split())
+
+
+def article_vector(headline, summary, headline_weight=2.0):
+    """Build an L2-normalized sublinear term-frequency vector from headline and summary"""
+    counts = {}
+    for text, weight in ((headline, headline_weight), (summary, 1.0)):
+        for token in TOKEN.findall((text or '').lower()):
+            if token not in STOPWORDS:
+                counts[token] = counts.get(token, 0.0) + weight
+    vector = {term: 1 + math.log(count) for term, count in counts.items()}
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {term: v / norm for term, v in vector.items()} if norm else {}
+
+
+class StoryClusterer:
+    """Online clustering of articles into stories
+
+    Each story keeps the running sum of its articles' term vectors as a
+    sparse centroid, truncated to its max_terms strongest terms. A new
+    article is compared with the active stories through an inverted index
+    from term to story, so only stories sharing a term are scored. It joins
+    the most similar story when the cosine similarity reaches the threshold
+    and starts a new story otherwise. Earlier assignments are never
+    revisited, so adding articles never re-clusters the history. Stories
+    without new articles for max_age_hours are retired. The active stories
+    are kept in a JSON file (in memory only when path is None, in which
+    case ids are drawn from UNSAVED_ID_RANGE). Id 0 means "not clustered".
+    """
+
+    def __init__(self, path=None, threshold=0.25, max_terms=100, max_age_hours=72):
+        self.path = path
+        self.threshold = threshold
+        self.max_terms = max_terms
+        self.max_age_hours = max_age_hours
+        self.lock = threading.Lock()
+        self.next_id = 1 if path else random.randrange(*UNSAVED_ID_RANGE)
+        self.stories = {}
+        self.index = {}
+        self.load()
+
+    def load(self):
+        """Load the active stories, starting empty if the file is missing or corrupt"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.next_id = int(data.get('next_id', 1))
+            for story_id, story in data.get('stories', {}).items():
+                self.stories[int(story_id)] = story
+        except (OSError, ValueError, AttributeError):
+            self.next_id = 1
+            self.stories = {}
+        for story_id, story in self.stories.items():
+            story['norm'] = math.sqrt(sum(w * w for w in story['terms'].values()))
+            for term in story['terms']:
+                self.index.setdefault(term, set()).add(story_id)
+
+    def save(self):
+        """Retire old stories and write the active ones to disk atomically"""
+        with self.lock:
+            self.retire_stories(time.time())
+            if not self.path:
+                return
+            data = {
+                'next_id': self.next_id,
+                'stories': {
+                    str(story_id): {k: v for k, v in story.items() if k != 'norm'}
+                    for story_id, story in self.stories.items()
+                }
+            }
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+
+    def retire_stories(self, now):
+        """Drop stories that have not received an article within max_age_hours"""
+        cutoff = now - self.max_age_hours * 3600
+        for story_id in [sid for sid, story in self.stories.items() if story['last_seen'] < cutoff]:
+            for term in self.stories.pop(story_id)['terms']:
+                members = self.index.get(term)
+                if members is not None:
+                    members.discard(story_id)
+                    if not members:
+                        del self.index[term]
+
+    def best_story(self, vector):
+        """Return (story id, cosine similarity) of the closest active story, or (None, 0)"""
+        scores = {}
+        for term, weight in vector.items():
+            for story_id in self.index.get(term, ()):
+                scores[story_id] = scores.get(story_id, 0.0) + weight * self.stories[story_id]['terms'][term]
+        best_id, best_score = None, 0.0
+        for story_id, score in scores.items():
+            similarity = score / self.stories[story_id]['norm']
+            if similarity > best_score:
+                best_id, best_score = story_id, similarity
+        return best_id, best_score
+
+    def add_to_story(self, story_id, vector, now):
+        """Fold an article vector into a story's centroid and update the inverted index"""
+        story = self.stories[story_id]
+        terms = story['terms']
+        for term, weight in vector.items():
+            terms[term] = terms.get(term, 0.0) + weight
+
+        # Keep only the strongest terms so centroids and the index stay small
+        if len(terms) > self.max_terms:
+            kept = dict(sorted(terms.items(), key=lambda item: item[1], reverse=True)[:self.max_terms])
+            for term in terms.keys() - kept.keys():
+                members = self.index.get(term)
+                if members is not None:
+                    members.discard(story_id)
+                    if not members:
+                        del self.index[term]
+            story['terms'] = terms = kept
+        for term in terms:
+            self.index.setdefault(term, set()).add(story_id)
+
+        story['norm'] = math.sqrt(sum(w * w for w in terms.values()))
+        story['count'] += 1
+        story['last_seen'] = now
+
+    def assign(self, headline, summary=''):
+        """Return the story id for an article, starting a new story if none is similar enough"""
+        vector = article_vector(headline, summary)
+        now = time.time()
+        with self.lock:
+            story_id, similarity = self.best_story(vector) if vector else (None, 0.0)
+            if story_id is None or similarity < self.threshold:
+                story_id = self.next_id
+                self.next_id += 1
+                self.stories[story_id] = {
+                    'terms': {}, 'norm': 0.0, 'count': 0,
+                    'first_seen': now, 'last_seen': now, 'headline': headline
+                }
+            self.add_to_story(story_id, vector, now)
+            return story_id
+
+    def assign_articles(self, articles):
+        """Set the story_id of each article dict"""
+        for article in articles:
+            article['story_id'] = self.assign(article.get('headline', ''), article.get('summary', ''))
+        return articles
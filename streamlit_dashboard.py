@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
 from datetime import datetime, timedelta
 import plotly.express as px
@@ -8,6 +9,9 @@ import json
 import time
 import random
 import warnings
+from story_clusters import StoryClusterer
+from article_table import PYARROW_AVAILABLE
+from news_retention import NewsRetention, read_news_file
 
 # Suppress the ScriptRunContext warnings
 warnings.filterwarnings("ignore", message=".*missing ScriptRunContext.*")
@@ -21,6 +25,15 @@ except ImportError as e:
     RSS_SCRAPER_AVAILABLE = False
     print(f"RSS Scraper import error: {str(e)}")
 
+# The article history is stored as Parquet and needs pyarrow
+try:
+    from parquet_store import ParquetArticleStore
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+from article_db import ArticleDatabase, FTS5_AVAILABLE
+
 # Set up the Streamlit page
 st.set_page_config(
     page_title="News Repository Dashboard",
@@ -30,6 +43,8 @@ st.set_page_config(
 
 # Create data directory if it doesn't exist
 DATA_DIR = "news_data"
+HISTORY_DIR = os.path.join(DATA_DIR, "articles")
+ARTICLE_DB_PATH = os.path.join(DATA_DIR, "articles.sqlite")
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # Function to generate sample data if scraper isn't available
@@ -116,24 +131,93 @@ def generate_sample_data():
 
 # Function to get a list of saved news files
 def get_saved_news_files():
-    """Get a list of all saved news CSV files"""
-    if not os.path.exists(DATA_DIR):
-        return []
-    
-    files = [f for f in os.listdir(DATA_DIR) if f.startswith("all_news_") and f.endswith(".csv")]
-    return sorted(files, reverse=True)
+    """Get the saved snapshots and monthly archives listed in the news_data manifest"""
+    files = NewsRetention(DATA_DIR).list_files()
+    if not PYARROW_AVAILABLE:
+        files = [f for f in files if f.endswith(".csv")]
+    return files
+
+# Function to give every article a story id, for the Stories view
+def assign_missing_stories(df):
+    """Cluster the rows without a story id (0 or missing) into stories, oldest first
+
+    These are rows saved before story clustering existed, and sample data.
+    Unsaved clusterers number their stories from a random offset, so the
+    new ids cannot clash with the stored ones.
+    """
+    if 'story_id' in df.columns:
+        story_ids = pd.to_numeric(df['story_id'], errors='coerce').fillna(0).to_numpy(dtype='int64', copy=True)
+    else:
+        story_ids = np.zeros(len(df), dtype='int64')
+    pending = np.flatnonzero(story_ids == 0)
+    if len(pending):
+        pending = pending[np.argsort(df['timestamp'].values[pending], kind='stable')]
+        headlines = df['headline'].to_numpy()
+        summaries = df['summary'].to_numpy()
+        clusterer = StoryClusterer()
+        for i in pending:
+            summary = summaries[i]
+            story_ids[i] = clusterer.assign(str(headlines[i]), '' if pd.isna(summary) else str(summary))
+    df['story_id'] = story_ids
+    return df
+
+# Function to prepare a dataset once, so reruns only have to filter it
+def prepare_news_frame(data):
+    """Return articles as a DataFrame with UTC timestamps, sorted categorical
+    category/source columns and a story id on every row, newest first (search
+    results stay in rank order)"""
+    df = pd.DataFrame(data)
+    # Timestamps are stored as ISO 8601 UTC, older files may mix formats
+    try:
+        df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True, format='ISO8601')
+    except (ValueError, TypeError):
+        df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True, format='mixed', errors='coerce')
+    for column in ('category', 'source'):
+        values = df[column].astype('category').cat.remove_unused_categories()
+        df[column] = values.cat.reorder_categories(sorted(values.cat.categories))
+    if 'rank' in df.columns:
+        df = df.sort_values('rank', kind='stable', ignore_index=True)
+    elif not df['timestamp'].is_monotonic_decreasing:
+        # Snapshots are saved newest first; sorting would copy the memory-mapped text
+        df = df.sort_values('timestamp', ascending=False, kind='stable', ignore_index=True)
+    return assign_missing_stories(df)
+
+# Saved files are read and prepared once per version of the file and shared by every session
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_prepared_file(filepath, mtime, size):
+    """Read and prepare a saved file; mtime and size make a rewritten file load again"""
+    return prepare_news_frame(read_news_file(filepath))
 
 # Function to load a specific news file
 def load_news_file(filename):
-    """Load a specific news CSV file"""
+    """Load a snapshot or monthly archive, memory-mapping Arrow snapshots"""
     filepath = os.path.join(DATA_DIR, filename)
     try:
-        df = pd.read_csv(filepath)
-        return df.to_dict('records')
+        stat = os.stat(filepath)
+        return load_prepared_file(filepath, stat.st_mtime, stat.st_size)
     except Exception as e:
         st.error(f"Error loading file {filename}: {str(e)}")
         return []
 
+# Function to open the Parquet article history written by the scraper and daemon
+def get_article_store():
+    """Return the article history store, or None if there is none yet"""
+    if not PARQUET_AVAILABLE or not os.path.isdir(HISTORY_DIR):
+        return None
+    return ParquetArticleStore(HISTORY_DIR)
+
+# Function to open the full-text search database written by the scraper
+@st.cache_resource(show_spinner=False)
+def open_article_db(path):
+    """Open the article search database once and reuse the connection across reruns"""
+    return ArticleDatabase(path)
+
+def get_article_db():
+    """Return the article search database, or None if there is none yet"""
+    if not FTS5_AVAILABLE or not os.path.exists(ARTICLE_DB_PATH):
+        return None
+    return open_article_db(ARTICLE_DB_PATH)
+
 # Create session state to store data
 if 'news_data' not in st.session_state:
     st.session_state.news_data = None
@@ -157,6 +241,7 @@ st.sidebar.markdown(f"RSS Scraper: {'✅ Available' if RSS_SCRAPER_AVAILABLE els
 st.sidebar.subheader("Data Sources")
 sample_data_button = st.sidebar.button("Load Sample Data")
 rss_fetch_button = st.sidebar.button("Fetch RSS News", disabled=not RSS_SCRAPER_AVAILABLE)
+enrich_summaries = st.sidebar.checkbox("Fetch full articles for short summaries", disabled=not RSS_SCRAPER_AVAILABLE)
 
 # Load previous data
 st.sidebar.subheader("Load Previous Data")
@@ -175,10 +260,57 @@ if saved_files:
 else:
     st.sidebar.info("No saved data files found")
 
+# Load a date range from the article history, reading only the partitions needed
+st.sidebar.subheader("Load History")
+article_store = get_article_store()
+history_dates = article_store.dates() if article_store else []
+if history_dates:
+    history_range = st.sidebar.date_input(
+        "History date range",
+        value=(max(history_dates[0], history_dates[-1] - timedelta(days=6)), history_dates[-1]),
+        min_value=history_dates[0],
+        max_value=history_dates[-1]
+    )
+    history_categories = st.sidebar.multiselect("History categories", article_store.categories())
+    load_history_button = st.sidebar.button("Load History")
+    
+    if load_history_button and len(history_range) == 2:
+        start_date, end_date = history_range
+        with st.spinner(f"Loading history from {start_date} to {end_date}..."):
+            st.session_state.news_data = prepare_news_frame(
+                article_store.read(start_date, end_date, history_categories or None)
+            )
+            st.session_state.current_file = f"history {start_date} to {end_date}"
+            st.session_state.last_updated = datetime.now()
+            st.success(f"Loaded {len(st.session_state.news_data)} news items from the article history")
+            st.rerun()
+else:
+    st.sidebar.info("No article history found")
+
+# Full-text search over every saved article
+st.sidebar.subheader("Search History")
+article_db = get_article_db()
+if article_db is not None:
+    history_query = st.sidebar.text_input(
+        "Search all saved articles",
+        help='Words must all match. Use "quotes" for phrases, infl* for prefixes, OR / NOT as operators.'
+    )
+    search_history_button = st.sidebar.button("Search History")
+    
+    if search_history_button and history_query:
+        with st.spinner(f"Searching for {history_query}..."):
+            st.session_state.news_data = prepare_news_frame(article_db.search(history_query, limit=1000))
+            st.session_state.current_file = f"search: {history_query}"
+            st.session_state.last_updated = datetime.now()
+            st.success(f"Found {len(st.session_state.news_data)} matching news items")
+            st.rerun()
+else:
+    st.sidebar.info("No search index found")
+
 # Button handlers
 if sample_data_button:
     with st.spinner("Generating sample data..."):
-        st.session_state.news_data = generate_sample_data()
+        st.session_state.news_data = prepare_news_frame(generate_sample_data())
         st.session_state.current_file = "sample_data"
         st.session_state.last_updated = datetime.now()
     st.success(f"Loaded {len(st.session_state.news_data)} sample news items")
@@ -189,6 +321,15 @@ if rss_fetch_button and RSS_SCRAPER_AVAILABLE:
         try:
             # Create RSS scraper and fetch data
             scraper = RSSNewsScraperMultiSource()
+            # The dashboard shows the full two-day window, so download every feed
+            # even if it has not changed since the last run, and only collapse
+            # duplicates within this fetch
+            scraper.use_conditional_get = False
+            scraper.seen_index_path = None
+            scraper.near_duplicate_path = None
+            scraper.story_cluster_path = None
+            # Keep feed parsing inside the Streamlit process instead of forking workers
+            scraper.parse_workers = 0
             st.info("Scraper created successfully. Fetching RSS feeds...")
             
             # Scrape all categories (now with no limit per feed)
@@ -201,31 +342,41 @@ if rss_fetch_button and RSS_SCRAPER_AVAILABLE:
             scraper.remove_duplicates()
             st.info(f"After removing duplicates: {len(scraper.all_articles)} articles.")
             
+            # Optionally replace one-line RSS summaries with summaries of the full articles
+            if enrich_summaries:
+                scraper.enrich_articles()
+            
+            # Articles were written to the search database feed by feed; write the last batch
+            scraper.close()
+            
             if scraper.all_articles:
-                st.session_state.news_data = scraper.all_articles
+                df = scraper.all_articles.to_frame()
+                st.session_state.news_data = prepare_news_frame(df)
                 st.session_state.last_updated = datetime.now()
                 
-                # Save the data
+                # Save the data (as an Arrow snapshot that later loads are memory-mapped from)
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"all_news_{timestamp}.csv"
-                filepath = os.path.join(DATA_DIR, filename)
-                
-                df = pd.DataFrame(scraper.all_articles)
-                df.to_csv(filepath, index=False, encoding='utf-8-sig')
+                if PYARROW_AVAILABLE:
+                    filename = f"all_news_{timestamp}.arrow"
+                    scraper.all_articles.save_snapshot(os.path.join(DATA_DIR, filename))
+                else:
+                    filename = f"all_news_{timestamp}.csv"
+                    df.to_csv(os.path.join(DATA_DIR, filename), index=False, encoding='utf-8-sig')
+                NewsRetention(DATA_DIR).add_snapshot(filename)
                 
                 st.session_state.current_file = filename
                 st.success(f"Successfully fetched {len(scraper.all_articles)} articles from RSS feeds")
             else:
                 st.error("RSS fetch completed but no articles found")
                 if st.session_state.news_data is None:
-                    st.session_state.news_data = generate_sample_data()
+                    st.session_state.news_data = prepare_news_frame(generate_sample_data())
                     st.session_state.current_file = "sample_data"
         except Exception as e:
             st.error(f"Error during RSS fetch: {str(e)}")
             import traceback
             st.code(traceback.format_exc(), language="python")
             if st.session_state.news_data is None:
-                st.session_state.news_data = generate_sample_data()
+                st.session_state.news_data = prepare_news_frame(generate_sample_data())
                 st.session_state.current_file = "sample_data"
     st.rerun()
 
@@ -233,8 +384,9 @@ if rss_fetch_button and RSS_SCRAPER_AVAILABLE:
 if st.session_state.news_data is None or len(st.session_state.news_data) == 0:
     st.info("No data loaded. Please load sample data, fetch RSS news, or select a saved file.")
 else:
-    # Convert to DataFrame for processing
-    df = pd.DataFrame(st.session_state.news_data)
+    # Every dataset is prepared once when it is loaded (see prepare_news_frame) and
+    # shared with the file cache, so it is only read here, never modified
+    df = st.session_state.news_data
     
     # Display current dataset info
     st.markdown(f"**Current dataset:** {st.session_state.current_file or 'None'}")
@@ -246,9 +398,9 @@ else:
     with col1:
         st.metric("Total Articles", len(df))
     with col2:
-        st.metric("News Categories", df['category'].nunique())
+        st.metric("News Categories", len(df['category'].cat.categories))
     with col3:
-        st.metric("News Sources", df['source'].nunique())
+        st.metric("News Sources", len(df['source'].cat.categories))
     
     # Filters
     st.subheader("Filter News Articles")
@@ -258,9 +410,8 @@ else:
     
     with col1:
         # Date filter
-        df['date'] = pd.to_datetime(df['timestamp']).dt.date
-        min_date = df['date'].min()
-        max_date = df['date'].max()
+        min_date = df['timestamp'].min().date()
+        max_date = df['timestamp'].max().date()
         selected_date_range = st.date_input(
             "Date Range",
             value=(min_date, max_date),
@@ -270,69 +421,110 @@ else:
         
     with col2:
         # Category filter
-        categories = sorted(df['category'].unique())
+        categories = list(df['category'].cat.categories)
         selected_categories = st.multiselect("Categories", categories)
     
     with col3:
         # Source filter
-        sources = sorted(df['source'].unique())
+        sources = list(df['source'].cat.categories)
         selected_sources = st.multiselect("Sources", sources)
     
     with col4:
         # Search filter
         search_query = st.text_input("Search headlines or summaries")
     
-    # Apply filters
-    filtered_df = df.copy()
+    # Apply filters: combine one boolean mask and select the matching rows once
+    mask = np.ones(len(df), dtype=bool)
     
     # Date filter
     if len(selected_date_range) == 2:
         start_date, end_date = selected_date_range
-        filtered_df = filtered_df[(filtered_df['date'] >= start_date) & (filtered_df['date'] <= end_date)]
+        start = pd.Timestamp(start_date, tz='UTC')
+        end = pd.Timestamp(end_date, tz='UTC') + pd.Timedelta(days=1)
+        mask &= ((df['timestamp'] >= start) & (df['timestamp'] < end)).to_numpy()
     
     # Category filter
     if selected_categories:
-        filtered_df = filtered_df[filtered_df['category'].isin(selected_categories)]
+        mask &= df['category'].isin(selected_categories).to_numpy()
     
     # Source filter
     if selected_sources:
-        filtered_df = filtered_df[filtered_df['source'].isin(selected_sources)]
+        mask &= df['source'].isin(selected_sources).to_numpy()
     
-    # Search filter
+    # Search filter (plain text, case-insensitive), only on the rows still selected
     if search_query:
-        search_query = search_query.lower()
-        filtered_df = filtered_df[
-            filtered_df['headline'].str.lower().str.contains(search_query) | 
-            filtered_df['summary'].str.lower().str.contains(search_query)
-        ]
+        rows = np.flatnonzero(mask)
+        headlines = df['headline'].iloc[rows]
+        summaries = df['summary'].iloc[rows]
+        found = (
+            headlines.str.contains(search_query, case=False, regex=False, na=False) |
+            summaries.str.contains(search_query, case=False, regex=False, na=False)
+        ).to_numpy()
+        mask[rows[~found]] = False
     
-    # Sort by date (newest first)
-    filtered_df = filtered_df.sort_values('timestamp', ascending=False)
+    # Already sorted by date (newest first), or by relevance for search results
+    filtered_df = df if mask.all() else df[mask]
     
-    # Show the filtered dataframe
-    st.subheader(f"News Articles ({len(filtered_df)} results)")
+    view = st.radio("View", ["Articles", "Stories"], horizontal=True)
     
-    # Display the table
-    st.dataframe(
-        filtered_df[['timestamp', 'category', 'source', 'headline', 'summary', 'url']],
-        column_config={
-            "timestamp": "Date",
-            "category": "Category",
-            "source": "Source",
-            "headline": "Headline",
-            "summary": "Summary",
-            "url": st.column_config.LinkColumn("Link")
-        },
-        hide_index=True,
-        use_container_width=True
-    )
+    if view == "Stories":
+        # Every row already has a story id (see assign_missing_stories)
+        # One row per story, with its newest headline and how widely it was covered
+        stories = (
+            filtered_df.groupby('story_id', sort=False)
+            .agg(
+                latest=('timestamp', 'max'),
+                sources=('source', 'nunique'),
+                articles=('headline', 'size'),
+                headline=('headline', 'first'),
+                url=('url', 'first')
+            )
+            .sort_values(['sources', 'latest'], ascending=False)
+        )
+        
+        st.subheader(f"News Stories ({len(stories)} stories from {len(filtered_df)} articles)")
+        st.dataframe(
+            stories[['latest', 'sources', 'articles', 'headline', 'url']],
+            column_config={
+                "latest": "Latest",
+                "sources": "Sources",
+                "articles": "Articles",
+                "headline": "Headline",
+                "url": st.column_config.LinkColumn("Link")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+    else:
+        # Show the filtered dataframe
+        st.subheader(f"News Articles ({len(filtered_df)} results)")
+        
+        # Display the table
+        st.dataframe(
+            filtered_df[['timestamp', 'category', 'source', 'headline', 'summary', 'url']],
+            column_config={
+                "timestamp": "Date",
+                "category": "Category",
+                "source": "Source",
+                "headline": "Headline",
+                "summary": "Summary",
+                "url": st.column_config.LinkColumn("Link")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
     
-    # Download button for filtered data
+    # Download button for filtered data. The CSV is only encoded again when the
+    # dataset or the filters change, not on every rerun.
     if not filtered_df.empty:
-        csv = filtered_df.to_csv(index=False).encode('utf-8')
+        csv_key = (id(df), len(df), tuple(selected_date_range), tuple(selected_categories),
+                   tuple(selected_sources), search_query)
+        if st.session_state.get('csv_key') != csv_key:
+            st.session_state.csv_data = filtered_df.to_csv(index=False).encode('utf-8')
+            st.session_state.csv_key = csv_key
         st.download_button(
             label="Download Filtered Data as CSV",
-            data=csv,
+            data=st.session_state.csv_data,
             file_name=f"filtered_news_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
             mime="text/csv",
         )
@@ -0,0 +1,35 @@
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from article_table import ArticleTable
+
+
+def article(i):
+    return {'headline': f"Headline {i}", 'summary': '', 'url': f"https://example.com/{i}", 'source': 'Example',
+            'category': 'World', 'timestamp': datetime(2026, 3, 2, 8, i, tzinfo=timezone.utc), 'story_id': i,
+            'guid': f"urn:example:{i}"}
+
+
+def test_append_while_an_arrow_table_is_alive():
+    table = ArticleTable([article(0), article(1)])
+    arrow_table = table.to_arrow()
+    table.append(article(2))
+    assert len(table) == 3
+    assert arrow_table.num_rows == 2
+    assert arrow_table['story_id'].to_pylist() == [0, 1]
+
+
+def test_rows_round_trip():
+    articles = [article(i) for i in range(3)]
+    assert list(ArticleTable(articles)) == articles
+
+
+def test_guid_is_kept_but_not_exported():
+    table = ArticleTable([article(0), article(1)])
+    table.keep_rows([1])
+    assert table.row(0)['guid'] == 'urn:example:1'
+    assert 'guid' not in table.to_frame().columns
+    assert 'guid' not in table.to_arrow().column_names
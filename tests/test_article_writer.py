@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from article_db import ArticleWriter
+
+
+class FailingDatabase:
+    """Stands in for ArticleDatabase and rejects any batch holding a 'bad' URL"""
+
+    def __init__(self):
+        self.urls = []
+        self.batch_sizes = []
+
+    def add_articles(self, articles):
+        self.batch_sizes.append(len(articles))
+        if any(article['url'] == 'bad' for article in articles):
+            raise ValueError("NOT NULL constraint failed")
+        self.urls.extend(article['url'] for article in articles)
+        return len(articles)
+
+
+def batch(first, count):
+    return [{'url': f"https://example.com/{i}"} for i in range(first, first + count)]
+
+
+def test_a_bad_row_is_dropped_after_the_retries():
+    db = FailingDatabase()
+    writer = ArticleWriter(db, batch_size=10, flush_interval=60)
+    writer.submit(batch(0, 9) + [{'url': 'bad'}])
+    for first in range(10, 40, 10):
+        writer.submit(batch(first, 10))
+    writer.flush()
+    writer.submit(batch(40, 10))
+    writer.close()
+
+    assert len(db.urls) == 49
+    assert 'bad' not in db.urls
+    assert writer.written == 49
+    # The retained batch never grew past max_attempts batches
+    assert max(db.batch_sizes) <= writer.max_attempts * 10
+
+
+def test_retained_batch_is_capped():
+    db = FailingDatabase()
+    writer = ArticleWriter(db, batch_size=10, flush_interval=60)
+    writer.max_retained = 15
+    writer.submit([{'url': 'bad'}] + batch(0, 9))
+    writer.submit(batch(9, 10))
+    writer.close()
+    assert max(db.batch_sizes) == 20
+    assert len(db.urls) == 19
@@ -0,0 +1,39 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_clean_text import previous_clean_text, make_texts, random_text
+from rss_scraper import RSSNewsScraperMultiSource
+
+
+@pytest.fixture(scope='module')
+def scraper():
+    return RSSNewsScraperMultiSource(parse_only=True)
+
+
+@pytest.fixture(scope='module')
+def texts():
+    # 50k strings: entities, tags, unicode and control whitespace, plus repeated boilerplate
+    headlines, summaries = make_texts(20000)
+    rng = random.Random(7)
+    extra = [random_text(rng, rng.randint(0, 30)) for _ in range(10000)]
+    return headlines + summaries + extra
+
+
+def test_clean_text_matches_previous_implementation(scraper, texts):
+    for text in texts:
+        assert scraper.clean_text(text) == previous_clean_text(text), repr(text)
+
+
+def test_clean_texts_matches_previous_implementation(scraper, texts):
+    assert scraper.clean_texts(texts) == [previous_clean_text(text) for text in texts]
+
+
+@pytest.mark.parametrize('value', [None, '', '   ', 42, '&amp;amp;', '<p>&lt;b&gt;bold&lt;/b&gt;</p>', 'a b', 'x&#0;y'])
+def test_edge_cases_match_previous_implementation(scraper, value):
+    assert scraper.clean_text(value) == previous_clean_text(value)
+    assert scraper.clean_texts([value]) == [previous_clean_text(value)]
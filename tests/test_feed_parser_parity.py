@@ -0,0 +1,94 @@
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rss_scraper
+from fast_feed_parser import iter_feed_entries, UnsupportedFeed
+from rss_scraper import RSSNewsScraperMultiSource
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'feeds')
+
+# @KIND:hours ago:offset@ placeholders, so the fixture dates stay inside the two-day window
+DATE_PLACEHOLDER = re.compile(r'@(RFC822|ISO|ISOFRAC):(\d+):([^@]+)@')
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+class FrozenDatetime(datetime):
+    """datetime whose now() is fixed, so undated entries get the same fetch time on both paths"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return NOW if tz is not None else NOW.replace(tzinfo=None)
+
+
+def render_date(kind, hours_ago, offset):
+    """Format NOW minus hours_ago in a feed date format and time zone offset"""
+    if offset == 'Z':
+        zone = timezone.utc
+    else:
+        sign = -1 if offset[0] == '-' else 1
+        digits = offset[1:].replace(':', '')
+        zone = timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:])))
+    value = (NOW - timedelta(hours=int(hours_ago))).astimezone(zone)
+    if kind == 'RFC822':
+        return value.strftime('%a, %d %b %Y %H:%M:%S ') + offset
+    if kind == 'ISOFRAC':
+        value = value.replace(microsecond=123456)
+    text = value.isoformat()
+    return text[:-6] + 'Z' if offset == 'Z' else text
+
+
+def load_fixture(name):
+    """Read a fixture feed with its date placeholders filled in"""
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        text = f.read()
+    text = DATE_PLACEHOLDER.sub(lambda m: render_date(*m.groups()), text)
+    encoding = 'iso-8859-1' if 'ISO-8859-1' in text[:100] else 'utf-8'
+    return text.encode(encoding)
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    monkeypatch.setattr(rss_scraper, 'datetime', FrozenDatetime)
+    return RSSNewsScraperMultiSource(parse_only=True)
+
+
+def parse(scraper, body, fast_parse):
+    scraper.fast_parse = fast_parse
+    articles, _ = scraper.parse_feed(body, {'content-type': 'application/xml'}, 'Test Source', 'Test Category')
+    return articles
+
+
+@pytest.mark.parametrize('name', sorted(os.listdir(FIXTURE_DIR)))
+def test_fast_and_feedparser_paths_yield_identical_articles(scraper, name):
+    body = load_fixture(name)
+    fast = parse(scraper, body, True)
+    slow = parse(scraper, body, False)
+    assert fast, f"{name} produced no articles"
+    assert fast == slow
+
+
+@pytest.mark.parametrize('name', sorted(n for n in os.listdir(FIXTURE_DIR) if n.startswith('fallback_')))
+def test_fallback_fixtures_are_rejected_by_the_fast_parser(name):
+    with pytest.raises(UnsupportedFeed):
+        list(iter_feed_entries(load_fixture(name), {'content-type': 'application/xml'}))
+
+
+def test_basic_feed_keeps_undated_and_out_of_range_entries(scraper):
+    articles = parse(scraper, load_fixture('rss_basic.xml'), True)
+    by_headline = {article['headline']: article for article in articles}
+    assert 'Old item is dropped' not in by_headline
+    assert by_headline['Undated item keeps the fetch time']['timestamp'] == NOW
+    assert by_headline['Out-of-range day keeps the fetch time']['timestamp'] == NOW
+
+
+def test_fractional_seconds_are_truncated(scraper):
+    articles = parse(scraper, load_fixture('atom_fractional.xml'), True)
+    assert articles
+    assert all(article['timestamp'].microsecond == 0 for article in articles)
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss_scraper import RSSNewsScraperMultiSource
+
+RSS = '<rss version="2.0"><channel><title>Example</title></channel></rss>'
+LONG_COMMENT = '<!-- ' + 'generated by a very chatty feed generator ' * 80 + '-->'
+
+
+@pytest.fixture(scope='module')
+def scraper():
+    return RSSNewsScraperMultiSource(parse_only=True)
+
+
+@pytest.mark.parametrize('body', [
+    RSS,
+    '﻿<?xml version="1.0" encoding="utf-8"?>\n' + RSS,
+    '<?xml version="1.0"?>\n<?xml-stylesheet type="text/xsl" href="/feed.xsl"?>\n' + LONG_COMMENT + RSS,
+    '<?xml version="1.0"?>\n<!DOCTYPE rss PUBLIC "-//Netscape Communications//DTD RSS 0.91//EN" '
+    '"http://my.netscape.com/publish/formats/rss-0.91.dtd">\n' + RSS,
+    '<!DOCTYPE rss [<!ENTITY nbsp "&#160;">]>\n' + RSS,
+    '<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"><title>Example</title></feed>',
+    '<?xml version="1.0"?><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"></rdf:RDF>',
+    # Comment still open at the end of the sniffed bytes: left to the parser
+    '<?xml version="1.0"?>\n<!-- ' + 'x' * 3000,
+])
+def test_feeds_are_accepted(scraper, body):
+    scraper.sniff_feed_body(body.encode('utf-8')[:2048])
+
+
+@pytest.mark.parametrize('encoding', ['utf-16', 'utf-16-le', 'utf-16-be', 'utf-32'])
+def test_utf16_and_utf32_feeds_are_accepted(scraper, encoding):
+    body = f'<?xml version="1.0" encoding="{encoding}"?>\n{LONG_COMMENT}{RSS}'
+    scraper.sniff_feed_body(body.encode(encoding)[:2048])
+
+
+@pytest.mark.parametrize('body', [
+    '<!DOCTYPE html><html><head><title>Not found</title></head></html>',
+    '<!-- cached page -->\n<html lang="en"><body></body></html>',
+    '<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"></urlset>',
+    '<?xml version="1.0"?><error>rate limited</error>',
+    '{"error": "not found"}',
+])
+def test_non_feeds_are_rejected(scraper, body):
+    with pytest.raises(ValueError, match='not a feed'):
+        scraper.sniff_feed_body(body.encode('utf-8')[:2048])
@@ -0,0 +1,57 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_retention import NewsRetention
+
+
+def add_snapshots(data_dir, worker, count):
+    retention = NewsRetention(data_dir)
+    for i in range(count):
+        name = f"all_news_2026{worker + 1:02d}{i % 28 + 1:02d}_{i // 28:02d}0000.arrow"
+        open(os.path.join(data_dir, name), 'wb').close()
+        retention.add_snapshot(name)
+
+
+def test_concurrent_writers_keep_every_snapshot(tmp_path):
+    data_dir = str(tmp_path)
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        for future in [executor.submit(add_snapshots, data_dir, worker, 40) for worker in range(4)]:
+            future.result()
+    assert len(NewsRetention(data_dir).list_files()) == 160
+
+
+def test_manifest_is_built_from_the_directory_when_missing(tmp_path):
+    data_dir = str(tmp_path)
+    for name in ('all_news_20260101_120000.csv', 'all_news_20260102_120000.arrow', 'World_20260101_120000.csv'):
+        open(os.path.join(data_dir, name), 'wb').close()
+    retention = NewsRetention(data_dir)
+    retention.add_snapshot('all_news_20260102_120000.arrow')
+    assert retention.list_files() == ['all_news_20260102_120000.arrow', 'all_news_20260101_120000.csv']
+
+
+def test_archive_keeps_url_less_articles_and_the_longest_summary(tmp_path):
+    data_dir = str(tmp_path)
+    first = pd.DataFrame({
+        'headline': ['A', 'No link 1', 'B'], 'summary': ['short', 'x', 'b'], 'url': ['https://a.example/', '', 'https://b.example/'],
+        'source': 'S', 'category': 'C', 'timestamp': ['2026-01-05T08:00:00+00:00'] * 3, 'story_id': 0,
+    })
+    second = pd.DataFrame({
+        'headline': ['A', 'No link 2', 'B'], 'summary': ['an enriched, longer summary', 'y', 'b'],
+        'url': ['https://a.example/', '', 'https://b.example/'],
+        'source': 'S', 'category': 'C', 'timestamp': ['2026-01-05T08:00:00+00:00', '2026-01-05T09:00:00+00:00', '2026-01-05T10:00:00+00:00'],
+        'story_id': 0,
+    })
+    first.to_csv(os.path.join(data_dir, 'all_news_20260105_080000.csv'), index=False)
+    second.to_csv(os.path.join(data_dir, 'all_news_20260105_100000.csv'), index=False)
+
+    retention = NewsRetention(data_dir)
+    assert retention.archive_month('2026-01', ['all_news_20260105_080000.csv', 'all_news_20260105_100000.csv']) == 4
+    archive = pd.read_parquet(os.path.join(data_dir, 'archive', 'news_2026-01.parquet'))
+    assert sorted(archive['headline']) == ['A', 'B', 'No link 1', 'No link 2']
+    assert archive.set_index('headline').loc['A', 'summary'] == 'an enriched, longer summary'
+    assert str(archive.set_index('headline').loc['B', 'timestamp']) == '2026-01-05 10:00:00+00:00'
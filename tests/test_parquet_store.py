@@ -0,0 +1,91 @@
+import os
+import shutil
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from article_table import ArticleTable
+from parquet_store import ParquetArticleStore
+
+START = datetime(2026, 3, 2, 8, 0, tzinfo=timezone.utc)
+
+
+def make_table(first, count):
+    table = ArticleTable()
+    table.extend({
+        'headline': f"Headline {i}", 'summary': f"Summary {i}", 'url': f"https://example.com/{i}",
+        'source': 'Example', 'category': 'World', 'timestamp': START + timedelta(minutes=i), 'guid': None,
+    } for i in range(first, first + count))
+    return table.to_arrow()
+
+
+def partition_dir(store):
+    (_, _, directory), = store.partitions()
+    return directory
+
+
+def test_compaction_merges_small_files(tmp_path):
+    store = ParquetArticleStore(str(tmp_path))
+    for batch in range(4):
+        store.append(make_table(batch * 10, 10))
+    assert store.compact() == 4
+    assert len(os.listdir(partition_dir(store))) == 1
+    assert sorted(store.read()['url']) == sorted(f"https://example.com/{i}" for i in range(40))
+
+
+def test_compaction_drops_rows_left_by_an_interrupted_compaction(tmp_path):
+    store = ParquetArticleStore(str(tmp_path / 'store'))
+    for batch in range(4):
+        store.append(make_table(batch * 10, 10))
+    directory = partition_dir(store)
+    originals = str(tmp_path / 'originals')
+    shutil.copytree(directory, originals)
+    store.compact()
+    # Crash after the merged file was swapped in, before the originals were removed
+    for name in os.listdir(originals):
+        shutil.copy(os.path.join(originals, name), directory)
+    assert len(store.read()) == 80
+
+    store.compact()
+    assert len(store.read()) == 40
+
+
+def test_compaction_drops_urls_already_in_large_files(tmp_path):
+    store = ParquetArticleStore(str(tmp_path))
+    store.append(make_table(0, 10), name='backfill-a')
+    # Files this size or bigger are left alone, like an earlier merged file
+    store.target_file_bytes = os.path.getsize(os.path.join(partition_dir(store), 'part-backfill-a-0.parquet'))
+    # Part of the same rows written again, plus new articles
+    store.append(make_table(0, 5), name='backfill-b')
+    for batch in range(1, 4):
+        store.append(make_table(batch * 10, 1))
+    assert len(store.read()) == 18
+
+    assert store.compact() == 4
+    assert len(store.read()) == 13
+
+
+def test_compaction_keeps_articles_without_a_url(tmp_path):
+    store = ParquetArticleStore(str(tmp_path))
+    for batch in range(4):
+        table = make_table(batch * 10, 3)
+        urls = table['url'].to_pylist()
+        urls[1] = ''
+        urls[2] = None
+        store.append(table.set_column(table.schema.get_field_index('url'), 'url', pa.array(urls, pa.string())))
+    assert store.compact() == 4
+    urls = store.read()['url']
+    assert len(urls) == 12
+    assert (urls == '').sum() == 4
+    assert urls.isna().sum() == 4
+
+
+def test_append_leaves_no_hidden_files(tmp_path):
+    store = ParquetArticleStore(str(tmp_path))
+    store.append(make_table(0, 5), name='batch')
+    store.append(make_table(0, 5), name='batch')
+    assert os.listdir(partition_dir(store)) == ['part-batch-0.parquet']
+    assert len(store.read()) == 5
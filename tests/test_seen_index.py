@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seen_index import SeenIndex
+
+
+def article(source, url, guid):
+    return {'source': source, 'url': url, 'guid': guid, 'headline': url}
+
+
+def test_guids_are_scoped_by_source(tmp_path):
+    index = SeenIndex(str(tmp_path / 'seen.sqlite'))
+    first = [article('Feed A', 'https://a.example/1', '1'), article('Feed B', 'https://b.example/1', '1')]
+    assert index.filter_new(first) == first
+    index.commit()
+
+    # Same GUID from the same feed under a new URL is the same article
+    assert index.filter_new([article('Feed A', 'https://a.example/1?ref=rss', '1')]) == []
+    # A third feed numbering its items the same way is not
+    other = [article('Feed C', 'https://c.example/1', '1')]
+    assert index.filter_new(other) == other
+    index.close()
+
+
+def test_canonical_urls_match_across_sources(tmp_path):
+    index = SeenIndex(str(tmp_path / 'seen.sqlite'))
+    assert len(index.filter_new([article('Feed A', 'https://x.example/story?utm_source=a', '')])) == 1
+    assert index.filter_new([article('Feed B', 'https://x.example/story', '')]) == []
+    index.close()
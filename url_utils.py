@@ -0,0 +1,37 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {'ref', 'ref_src', 'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'cmpid', 'ocid', 'soc_src', 'soc_trk'}
+
+
+def is_tracking_param(name):
+    """Check whether a query parameter is a tracking tag rather than part of the address"""
+    name = name.lower()
+    return name.startswith('utm_') or name in TRACKING_PARAMS
+
+
+def canonicalize_url(url):
+    """Normalize an article URL so trivially different spellings compare equal
+
+    Lowercases the scheme and host, drops default ports, the fragment,
+    tracking parameters (utm_*, ref, fbclid...) and trailing slashes, and
+    sorts the remaining query parameters.
+    """
+    if not url:
+        return ''
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url.strip()
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if port and str(port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+
+    path = parts.path.rstrip('/') or '/'
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not is_tracking_param(k)]
+    return urlunsplit((scheme, host, path, urlencode(sorted(params)), ''))